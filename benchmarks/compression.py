@@ -0,0 +1,79 @@
+"""Transfer size and time of full-collection reads with and without compression.
+
+Reads every page of ``/users``, ``/posts`` and ``/todos`` from a local stub
+server seeded with ``--seed-size`` users, once per ``Accept-Encoding``, and
+prints the decompressed and on-the-wire bytes that ``MetricsRecorder``
+accounted for each endpoint.
+
+    python benchmarks/compression.py [--seed-size N] [--per-page N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+COLLECTIONS = ("/users", "/posts", "/todos")
+
+
+def read_all(client, endpoint, per_page):
+    page = 1
+    while True:
+        response = client.get(endpoint, params={"page": page, "per_page": per_page})
+        response.raise_for_status()
+        if page >= int(response.headers["X-Pagination-Pages"]):
+            return
+        page += 1
+
+
+def run(base_url, compression, per_page, repeat):
+    from support.client import Client
+    from support.metrics import MetricsRecorder
+    from support.transport import TransportConfig
+
+    metrics = MetricsRecorder()
+    client = Client(base_url, "token", metrics=metrics)
+    TransportConfig(concurrency=1, compression=compression).apply(client)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for endpoint in COLLECTIONS:
+            read_all(client, endpoint, per_page)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    client.session.close()
+    return best, metrics.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed-size", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from support.stub_server import StubServer
+    from support.transport import accept_encoding
+
+    with StubServer(seed_size=args.seed_size) as server:
+        for compression in (False, True):
+            elapsed, summary = run(
+                server.base_url, compression, args.per_page, args.repeat
+            )
+            print(f"Accept-Encoding: {accept_encoding(compression)}")
+            print(f"  best of {args.repeat}: {elapsed * 1000:.1f} ms")
+            for name, stats in summary.items():
+                ratio = stats["wire_bytes"] / stats["bytes"]
+                print(
+                    f"  {name:<11} {stats['requests'] // args.repeat:4d} requests"
+                    f" {stats['bytes'] // args.repeat:10d} bytes"
+                    f" {stats['wire_bytes'] // args.repeat:10d} on the wire"
+                    f" ({ratio:.0%})"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""HTTP/1.1 connection pool versus HTTP/2 multiplexing.
+
+Sends the same burst of concurrent GETs through ``TimedHTTPAdapter`` to a
+threading HTTP/1.1 server and through ``Http2Adapter`` to a cleartext
+HTTP/2 server built on h2. Both servers answer every request with the same
+JSON page after ``--delay`` seconds of simulated server time and count the
+connections they accept. Needs ``pip install 'httpx[http2]'``.
+
+    python benchmarks/http2.py [--requests N] [--concurrency N] [--delay S]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+BODY = json.dumps(
+    [
+        {
+            "id": i,
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "gender": "female",
+            "status": "active",
+        }
+        for i in range(1, 11)
+    ]
+).encode()
+
+
+class Http1Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay):
+        super().__init__(("127.0.0.1", 0), Http1Handler)
+        self.delay = delay
+        self.connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class Http1Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Http2Server:
+    """Cleartext HTTP/2 server, clients must connect with prior knowledge."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.connections = 0
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+
+    def serve_forever(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        lock = threading.Lock()
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+
+        def respond(stream_id):
+            # streams are answered concurrently, like the threaded HTTP/1.1 server
+            time.sleep(self.delay)
+            with lock:
+                conn.send_headers(
+                    stream_id,
+                    [
+                        (":status", "200"),
+                        ("content-type", "application/json"),
+                        ("content-length", str(len(BODY))),
+                    ],
+                )
+                conn.send_data(stream_id, BODY, end_stream=True)
+                sock.sendall(conn.data_to_send())
+
+        with sock:
+            while True:
+                try:
+                    data = sock.recv(65535)
+                except OSError:
+                    return
+                if not data:
+                    return
+                with lock:
+                    events = conn.receive_data(data)
+                    sock.sendall(conn.data_to_send())
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        threading.Thread(
+                            target=respond, args=(event.stream_id,), daemon=True
+                        ).start()
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+
+    def shutdown(self):
+        self.sock.close()
+
+
+def burst(adapter, url, requests_count, concurrency):
+    import requests
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+
+    def get(_):
+        response = session.get(url, timeout=(5, 30))
+        response.raise_for_status()
+        return len(response.content)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        received = sum(executor.map(get, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    session.close()
+    assert received == len(BODY) * requests_count
+    return elapsed
+
+
+def run_http1(args):
+    from support.transport import TimedHTTPAdapter
+
+    server = Http1Server(args.delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = TimedHTTPAdapter(
+        pool_connections=args.concurrency, pool_maxsize=args.concurrency
+    )
+    url = f"http://127.0.0.1:{server.server_address[1]}/users"
+    try:
+        elapsed = burst(adapter, url, args.requests, args.concurrency)
+    finally:
+        server.shutdown()
+    return elapsed, server.connections
+
+
+def run_http2(args):
+    from support.http2 import Http2Adapter
+
+    server = Http2Server(args.delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = Http2Adapter(max_connections=args.concurrency, prior_knowledge=True)
+    url = f"http://127.0.0.1:{server.port}/users"
+    try:
+        elapsed = burst(adapter, url, args.requests, args.concurrency)
+    finally:
+        server.shutdown()
+    return elapsed, server.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    from support.http2 import INSTALL_HINT, http2_available
+
+    if not http2_available():
+        sys.exit(f"httpx with HTTP/2 support is not installed: {INSTALL_HINT}")
+
+    print(
+        f"{args.requests} GETs, {args.concurrency} concurrent,"
+        f" {args.delay * 1000:.0f} ms server time"
+    )
+    for name, run in (("HTTP/1.1", run_http1), ("HTTP/2", run_http2)):
+        elapsed, connections = run(args)
+        print(
+            f"{name:<9} {elapsed:7.3f} s {args.requests / elapsed:8.1f} req/s"
+            f" {connections:4d} connections"
+        )
+
+
+if __name__ == "__main__":
+    main()
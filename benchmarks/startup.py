@@ -0,0 +1,119 @@
+"""Startup cost of the test suite.
+
+Measures the import time of ``tests/conftest.py`` with ``python -X importtime``
+and the wall-clock time of pytest runs that do no API work: ``--help``,
+``--collect-only`` and a run that exits in ``pytest_configure`` because
+API_TOKEN is not set. Each run starts a fresh interpreter, like a CI job.
+
+    python benchmarks/startup.py [--repeat N] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS_DIR = os.path.join(ROOT, "tests")
+
+# a dummy token, so that only the missing-token run exits for the lack of one
+DUMMY_TOKEN = "startup-benchmark-token"
+
+RUNS = {
+    "help": (["--help"], DUMMY_TOKEN),
+    "collect-only": (["--collect-only", "-q", "--offline"], DUMMY_TOKEN),
+    "missing-token": ([], None),
+}
+
+
+def environment(token=None):
+    env = dict(os.environ)
+    for name in ("API_TOKEN", "GOREST_OFFLINE", "GOREST_CASSETTE", "PYTEST_WORKERS"):
+        env.pop(name, None)
+    if token is not None:
+        env["API_TOKEN"] = token
+    return env
+
+
+def parse_importtime(stderr):
+    """``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_imports(env, top=10):
+    # pytest is imported first so its own cost is not charged to conftest
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pytest, conftest"],
+        cwd=TESTS_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = parse_importtime(result.stderr)
+    names = list(modules)
+    start = names.index("pytest") + 1
+    own = {name: modules[name] for name in names[start:]}
+    heaviest = sorted(own.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "conftest_us": modules["conftest"][1],
+        "pytest_us": modules["pytest"][1],
+        "heaviest": [
+            {"module": name, "self_us": self_us, "cumulative_us": cumulative_us}
+            for name, (self_us, cumulative_us) in heaviest[:top]
+        ],
+    }
+
+
+def time_run(args, env):
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args(argv)
+
+    imports = measure_imports(environment())
+    runs = {}
+    for name, (run_args, token) in RUNS.items():
+        env = environment(token)
+        samples = [time_run(run_args, env) for _ in range(args.repeat)]
+        runs[name] = {"median_s": statistics.median(samples), "min_s": min(samples)}
+
+    print(f"conftest import: {imports['conftest_us'] / 1000:.1f} ms", end=" ")
+    print(f"(pytest itself: {imports['pytest_us'] / 1000:.1f} ms)")
+    for module in imports["heaviest"]:
+        print(f"  {module['module']:<40} {module['self_us'] / 1000:7.1f} ms self")
+    for name, stats in runs.items():
+        print(
+            f"pytest {name:<14} median {stats['median_s'] * 1000:7.1f} ms,"
+            f" min {stats['min_s'] * 1000:7.1f} ms"
+        )
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"imports": imports, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
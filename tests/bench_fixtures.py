@@ -0,0 +1,90 @@
+"""Per-test overhead of the suite's fixtures.
+
+Not collected by default; run explicitly:
+
+    pytest tests/bench_fixtures.py --offline [--bench-update]
+"""
+
+import pytest
+
+from support.client import Client
+from support.stub_server import StubServer
+
+VALID = {
+    "user": {
+        "id": 1,
+        "name": "Foo Bar",
+        "email": "foo@example.com",
+        "gender": "male",
+        "status": "active",
+    },
+    "post": {"id": 1, "user_id": 1, "title": "Foo", "body": "Bar"},
+    "todo": {
+        "id": 1,
+        "user_id": 1,
+        "title": "Foo",
+        "due_on": "2030-01-01T00:00:00.000+05:30",
+        "status": "pending",
+    },
+}
+INVALID = {
+    "user": {"id": "1", "name": None, "gender": "foobar"},
+    "post": {"id": 0, "user_id": 1, "title": ""},
+    "todo": {"id": 1, "title": "Foo", "status": "done"},
+}
+SCHEMAS = tuple(VALID)
+
+
+class FakeResponse:
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+
+
+@pytest.mark.parametrize("name", SCHEMAS)
+def test_validate_jsonschema_valid(benchmark, validate_jsonschema, get_schema, name):
+    schema, instance = get_schema(name), VALID[name]
+
+    def validate():
+        validate_jsonschema(instance, schema)
+
+    benchmark(f"validate_jsonschema[valid-{name}]", validate)
+
+
+@pytest.mark.parametrize("name", SCHEMAS)
+def test_validate_jsonschema_invalid(benchmark, validate_jsonschema, get_schema, name):
+    schema, instance = get_schema(name), INVALID[name]
+
+    def validate():
+        with pytest.raises(pytest.fail.Exception):
+            validate_jsonschema(instance, schema)
+
+    benchmark(f"validate_jsonschema[invalid-{name}]", validate)
+
+
+def test_get_schema(benchmark, get_schema):
+    get_schema("user")
+    benchmark("get_schema[cached]", lambda: get_schema("user"))
+
+
+def test_response_is_json(benchmark, response_is_json):
+    response = FakeResponse()
+    benchmark("response_is_json", lambda: response_is_json(response))
+
+
+def test_client_get(benchmark):
+    with StubServer() as server:
+        client = Client(server.base_url, "token")
+        params = {"per_page": 1}
+        client.get("/users", params=params)
+        benchmark("Client.get[loopback]", lambda: client.get("/users", params=params))
+
+
+@pytest.mark.parametrize("name", SCHEMAS)
+def test_payloads(benchmark, payloads, name):
+    generator = payloads(name)
+
+    def batch():
+        # a whole batch, so every measured call includes one refill
+        for _ in range(generator.batch_size):
+            generator.next()
+
+    benchmark(f"payloads[{name}-x{generator.batch_size}]", batch)
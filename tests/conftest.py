@@ -1,133 +1,853 @@
+import contextlib
 import os
+import random
+import warnings
 
 import pytest
-import requests
-import jsonschema
 import json
-from faker import Faker
+
+# before the import through support.load, so its asserts get rewritten
+pytest.register_assert_rewrite("support.scenarios")
+
+from support.cache import ResponseCache
+from support.cleanup import DeletionQueue, ResourceTracker
+from support.client import AsyncClient, Client
+from support.crawler import CollectionCrawler
+from support.diagnostics import (
+    MAX_CHARS,
+    VERBOSE_MAX_CHARS,
+    ValidationFailure,
+    collect_errors,
+)
+from support.hedging import Hedger
+from support.load import LoadRunner
+from support.metrics import LatencyHtmlReport, LatencyReport, MetricsRecorder
+from support.parallel import (
+    ParallelRunner,
+    WorkerReports,
+    parse_shard,
+    select_shard,
+    worker_seed,
+)
+from support.payloads import PayloadFactory
+from support.ratelimit import RequestScheduler
+from support.report import JsonlReport, RequestLog
+from support.scenarios import is_json
+from support.singleflight import SingleFlight
+from support.streaming import iter_json_array, validate_array_stream
+from support.uniqueness import DuplicateDetector
+from support.user_pool import UserPool
+from support.validation import ValidatorRegistry
+
+# support.cassette, stub_server and transport import requests or
+# http.server, so they are imported where first used to keep --help,
+# --collect-only and runs that exit early fast.
 
 BASE_URL = "https://gorest.co.in/public/v2"
 TOKEN = os.environ.get("API_TOKEN")
+OFFLINE_TOKEN = "offline-stub-token"
+# full crawls are restarted when the collection changes under them
+CRAWL_ATTEMPTS = 3
+STREAM_CHUNK_SIZE = 16384
+BENCH_BASELINES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "benchmarks",
+    "baselines.json",
+)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--offline",
+        action="store_true",
+        default=False,
+        help=(
+            "Run against an in-process GoREST stand-in instead of the public API"
+            " (also enabled by GOREST_OFFLINE=1)."
+        ),
+    )
+    parser.addoption(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("PYTEST_WORKERS", 1)),
+        help="Split the tests across N worker processes (or PYTEST_WORKERS).",
+    )
+    parser.addoption(
+        "--no-fast-validators",
+        action="store_true",
+        default=False,
+        help="Validate with jsonschema only, skipping the generated fast path.",
+    )
+    parser.addoption(
+        "--user-pool-size",
+        type=int,
+        default=int(os.environ.get("USER_POOL_SIZE", 8)),
+        help=(
+            "Number of users created ahead of time for create_user"
+            " (or USER_POOL_SIZE, 0 disables the pool)."
+        ),
+    )
+    parser.addoption(
+        "--keep-resources",
+        action="store_true",
+        default=False,
+        help="Don't delete the users, posts and todos created during the run.",
+    )
+    parser.addoption(
+        "--cassette",
+        default=os.environ.get("GOREST_CASSETTE"),
+        help=(
+            "Directory of a cassette to record API interactions to or replay"
+            " them from (or GOREST_CASSETTE)."
+        ),
+    )
+    parser.addoption(
+        "--cassette-mode",
+        choices=("auto", "record", "replay"),
+        default="auto",
+        help="auto replays an existing cassette and records a missing one.",
+    )
+    parser.addoption(
+        "--max-retries",
+        type=int,
+        default=5,
+        help="Retries for throttled (429) and failed (5xx) API requests.",
+    )
+    parser.addoption(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum concurrent API requests, also the connection pool size.",
+    )
+    parser.addoption(
+        "--connect-timeout",
+        type=float,
+        default=5.0,
+        help="Seconds to wait for a connection to the API.",
+    )
+    parser.addoption(
+        "--read-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for an API response.",
+    )
+    parser.addoption(
+        "--warm-connections",
+        type=int,
+        default=4,
+        help="Keep-alive connections to open when the session starts.",
+    )
+    parser.addoption(
+        "--http2",
+        action="store_true",
+        default=False,
+        help=(
+            "Multiplex requests over HTTP/2 connections"
+            " (needs httpx[http2], offline runs stay on HTTP/1.1)."
+        ),
+    )
+    parser.addoption(
+        "--no-compression",
+        action="store_true",
+        default=False,
+        help="Ask the API for uncompressed responses (Accept-Encoding: identity).",
+    )
+    parser.addoption(
+        "--no-coalesce",
+        action="store_true",
+        default=False,
+        help="Send every GET even when an identical one is already in flight.",
+    )
+    parser.addoption(
+        "--hedge-budget",
+        type=float,
+        default=0.0,
+        help=(
+            "Fraction of GETs that may be duplicated when slower than their"
+            " route's p95 latency; 0 disables hedging. Ignored with --cassette."
+        ),
+    )
+    parser.addoption(
+        "--cache-ttl",
+        type=float,
+        default=0.0,
+        help=(
+            "Seconds to reuse GET responses for, revalidating them with ETags"
+            " afterwards; 0 disables the cache. Ignored with --cassette."
+        ),
+    )
+    parser.addoption(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Most GET responses kept by the cache.",
+    )
+    parser.addoption(
+        "--latency-json",
+        default=None,
+        help="Write per-endpoint latency percentiles to this JSON file.",
+    )
+    parser.addoption(
+        "--report-jsonl",
+        default=None,
+        help=(
+            "Append each test result and its API requests to this JSONL file"
+            " as the run goes; render it with tests/support/report.py."
+        ),
+    )
+    parser.addoption(
+        "--full-crawl",
+        action="store_true",
+        default=False,
+        help="Check every page of /users, /posts and /todos, not just the first.",
+    )
+    group = parser.getgroup("load", "load generation")
+    group.addoption(
+        "--load",
+        action="store_true",
+        default=False,
+        help="Run weighted user-journey scenarios as load instead of the tests.",
+    )
+    group.addoption(
+        "--load-concurrency",
+        type=int,
+        default=10,
+        help="Virtual users running scenarios at the same time.",
+    )
+    group.addoption(
+        "--load-duration",
+        type=float,
+        default=30.0,
+        help="Seconds to generate load for.",
+    )
+    group.addoption(
+        "--load-ramp-up",
+        type=float,
+        default=0.0,
+        help="Seconds over which virtual users are started.",
+    )
+    group.addoption(
+        "--load-rps",
+        type=float,
+        default=0.0,
+        help="Target requests per second across all virtual users (0: unpaced).",
+    )
+    group.addoption(
+        "--load-scenario",
+        action="append",
+        default=[],
+        metavar="NAME=WEIGHT",
+        help="Scenario weight (journey, browse, invalid); may be repeated.",
+    )
+    group.addoption(
+        "--load-max-error-rate",
+        type=float,
+        default=1.0,
+        help="Fail the run when more scenarios than this fraction fail.",
+    )
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--bench-baselines",
+        default=BENCH_BASELINES,
+        help="JSON file with the microbenchmark baselines (bench_*.py).",
+    )
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.5,
+        help="Fail a microbenchmark this much slower than its baseline.",
+    )
+    group.addoption(
+        "--bench-update",
+        action="store_true",
+        default=False,
+        help="Record the microbenchmark results as the new baselines.",
+    )
+    parser.addoption(
+        "--shard",
+        default=None,
+        help="Only run the INDEX/COUNT round-robin slice of the collected tests.",
+    )
+    parser.addoption(
+        "--worker-reports",
+        default=None,
+        help="Save the test reports as JSON lines for the --workers main process.",
+    )
+
+
+def is_offline(config):
+    env_value = os.environ.get("GOREST_OFFLINE", "").lower()
+    return config.getoption("offline") or env_value in ("1", "true", "yes")
 
 
 def pytest_configure(config):
-    if not TOKEN:
+    config.addinivalue_line(
+        "markers",
+        "mutates(*resources): the test changes its existing_user, so it gets"
+        " a fresh one instead of the shared user.",
+    )
+    shard = config.getoption("shard")
+    if shard:
+        try:
+            config.shard = parse_shard(shard)
+        except ValueError as exc:
+            pytest.exit(f"{exc}\n")
+    else:
+        config.shard = None
+    reports_path = config.getoption("worker_reports")
+    if reports_path:
+        config.pluginmanager.register(
+            WorkerReports(config, reports_path), "worker-reports"
+        )
+
+    workers = config.getoption("workers")
+    parallel_main = config.shard is None and workers > 1
+    config.cassette = None if parallel_main else open_cassette(config)
+    if parallel_main:
+        # workers open their own cassettes and check the token themselves
+        replaying = bool(config.getoption("cassette"))
+    else:
+        replaying = config.cassette is not None and config.cassette.mode == "replay"
+
+    if not TOKEN and not is_offline(config) and not replaying:
         pytest.exit("API_TOKEN environment variable is not set. Set it to run tests.\n")
 
+    if config.getoption("http2"):
+        from support.http2 import INSTALL_HINT, http2_available
 
-@pytest.fixture(scope="session")
-def rest_client():
-    class Client:
-        def __init__(self):
-            self.session = requests.Session()
-
-        def get(self, endpoint, params=None):
-            params = params or {}
-            return self.session.get(f"{BASE_URL}{endpoint}", params=params)
-
-        def post(self, endpoint, data):
-            headers = {"Authorization": f"Bearer {TOKEN}"}
-            return self.session.post(
-                f"{BASE_URL}{endpoint}", json=data, headers=headers
+        if not http2_available():
+            pytest.exit(f"--http2 needs httpx with HTTP/2 support: {INSTALL_HINT}\n")
+
+    if config.getoption("load"):
+        if parallel_main or replaying:
+            pytest.exit("--load can't be combined with --workers or a replay.\n")
+        try:
+            runner = LoadRunner(
+                config, open_api_target, build_client, make_payloads, clean_up_resources
             )
-        
-        def put(self, endpoint, data):
-            headers = {"Authorization": f"Bearer {TOKEN}"}
-            return self.session.put(
-                f"{BASE_URL}{endpoint}", json=data, headers=headers
+        except ValueError as exc:
+            pytest.exit(f"{exc}\n")
+        config.pluginmanager.register(runner, "load-runner")
+
+    if parallel_main:
+        config.pluginmanager.register(
+            ParallelRunner(config, workers), "parallel-runner"
+        )
+        config.latency = None
+        config.request_log = None
+    else:
+        config.latency = MetricsRecorder()
+        config.request_log = None
+        report_path = config.getoption("report_jsonl")
+        if report_path:
+            config.request_log = RequestLog()
+            config.pluginmanager.register(
+                JsonlReport(report_path, config.request_log), "jsonl-report"
             )
-        
-        def delete(self, endpoint):
-            headers = {"Authorization": f"Bearer {TOKEN}"}
-            return self.session.delete(f"{BASE_URL}{endpoint}", headers=headers)
+        config.pluginmanager.register(
+            LatencyReport(config.latency, config.getoption("latency_json")),
+            "latency-report",
+        )
+        if config.pluginmanager.hasplugin("html"):
+            config.pluginmanager.register(
+                LatencyHtmlReport(config.latency), "latency-html-report"
+            )
+
+
+def open_cassette(config):
+    path = config.getoption("cassette")
+    if not path:
+        return None
+    if config.shard is not None:
+        path = os.path.join(path, f"worker-{config.shard[0]}")
+    from support.cassette import Cassette
+
+    mode = config.getoption("cassette_mode")
+    if mode == "auto":
+        mode = "replay" if Cassette.exists(path) else "record"
+    if mode == "replay" and not Cassette.exists(path):
+        pytest.exit(f"No cassette recorded at {path}.\n")
+
+    cassette = Cassette(path, mode)
+    # Generated request bodies only match the recording with the same seed
+    if mode == "replay":
+        os.environ["FAKER_SEED"] = str(cassette.read_meta()["faker_seed"])
+    else:
+        seed = os.environ.get("FAKER_SEED") or str(random.randrange(2**32))
+        os.environ["FAKER_SEED"] = seed
+        cassette.write_meta({"faker_seed": int(seed)})
+    return cassette
+
+
+def pytest_unconfigure(config):
+    if getattr(config, "cassette", None) is not None:
+        config.cassette.close()
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.shard is None:
+        return
+    selected, deselected = select_shard(items, *config.shard)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@contextlib.contextmanager
+def open_api_target(config):
+    """Yield the ``(base_url, token)`` to test against."""
+    cassette = config.cassette
+    if cassette is not None and cassette.mode == "replay":
+        yield BASE_URL, TOKEN or OFFLINE_TOKEN
+        return
+    if not is_offline(config):
+        yield BASE_URL, TOKEN
+        return
+    from support.stub_server import StubServer
+
+    with StubServer() as server:
+        yield server.base_url, TOKEN or OFFLINE_TOKEN
+
+
+@pytest.fixture(scope="session")
+def api_target(request):
+    with open_api_target(request.config) as target:
+        yield target
+
+
+def transport_config(config):
+    from support.transport import TransportConfig, pool_size
 
-    return Client()
+    return TransportConfig(
+        concurrency=config.getoption("concurrency"),
+        pool_size=pool_size(config),
+        connect_timeout=config.getoption("connect_timeout"),
+        read_timeout=config.getoption("read_timeout"),
+        http2=config.getoption("http2"),
+        compression=not config.getoption("no_compression"),
+    )
+
+
+def build_client(config, base_url, token):
+    from support.cassette import CassetteAdapter
+
+    scheduler = RequestScheduler(
+        # parallel workers split the API's rate limit evenly
+        share=config.shard[1] if config.shard else 1,
+        max_retries=config.getoption("max_retries"),
+    )
+    cassette = config.cassette
+    if cassette is not None and cassette.mode == "replay":
+        scheduler.sleep = lambda seconds: None
+    cache = None
+    ttl = config.getoption("cache_ttl")
+    # replays need the exact request sequence of the recording, not one
+    # that depends on when cache entries expired
+    if ttl > 0 and cassette is None:
+        cache = ResponseCache(ttl=ttl, max_entries=config.getoption("cache_size"))
+    config.response_cache = cache
+    # like the cache, coalescing would make the request sequence timing-dependent
+    coalescer = None
+    if not config.getoption("no_coalesce") and cassette is None:
+        coalescer = SingleFlight()
+    config.coalescer = coalescer
+    hedger = None
+    budget = config.getoption("hedge_budget")
+    if budget > 0 and cassette is None:
+        hedger = Hedger(budget=budget, max_workers=2 * config.getoption("concurrency"))
+    config.hedger = hedger
+    client = Client(
+        base_url,
+        token,
+        tracker=ResourceTracker(),
+        scheduler=scheduler,
+        metrics=config.latency,
+        cache=cache,
+        coalescer=coalescer,
+        request_log=config.request_log,
+        hedger=hedger,
+    )
+    transport = transport_config(config)
+    adapter = transport.apply(client)
+    if cassette is None or cassette.mode == "record":
+        transport.warm_up(client, config.getoption("warm_connections"))
+    if cassette is not None:
+        # mounted after warming up so warm-up requests are not recorded
+        adapter = CassetteAdapter(cassette, adapter=adapter)
+        client.session.mount("http://", adapter)
+        client.session.mount("https://", adapter)
+    return client
+
+
+def clean_up_resources(config, client):
+    tracker = client.tracker
+    if config.getoption("keep_resources"):
+        config.cleanup_summary = (
+            f"{tracker.created} created, {len(tracker.pending())} kept"
+            " (--keep-resources)"
+        )
+        return
+    deletions = DeletionQueue(
+        client, tracker, concurrency=config.getoption("concurrency")
+    ).drain()
+    config.cleanup_summary = deletions.summary()
+    config.cleanup_leaked = deletions.leaked
+
+
+@pytest.fixture(scope="session")
+def rest_client(request, api_target):
+    client = build_client(request.config, *api_target)
+    yield client
+    clean_up_resources(request.config, client)
+    if client.hedger is not None:
+        client.hedger.close()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    rows = getattr(config, "benchmark_rows", None)
+    if rows:
+        terminalreporter.write_sep("-", "microbenchmarks")
+        for row in rows:
+            terminalreporter.write_line(row)
+    summary = getattr(config, "cleanup_summary", None)
+    if summary is None:
+        return
+    terminalreporter.write_sep("-", "created resources")
+    terminalreporter.write_line(summary)
+    for path, error in getattr(config, "cleanup_leaked", ()):
+        terminalreporter.write_line(f"  leaked {path}: {error}")
+    cache = getattr(config, "response_cache", None)
+    if cache is not None:
+        terminalreporter.write_line(f"GET cache: {cache.summary()}")
+    coalescer = getattr(config, "coalescer", None)
+    if coalescer is not None and coalescer.shared:
+        terminalreporter.write_line(
+            f"coalesced GETs: {coalescer.shared} shared an in-flight request"
+        )
+    hedger = getattr(config, "hedger", None)
+    if hedger is not None:
+        terminalreporter.write_line(f"GET hedging: {hedger.summary()}")
+
+
+@pytest.fixture(scope="session")
+def benchmark(request):
+    """``benchmark(name, func)`` times ``func`` against its stored baseline."""
+    from support.bench import BenchmarkRecorder
+
+    config = request.config
+    recorder = BenchmarkRecorder(
+        config.getoption("bench_baselines"),
+        threshold=config.getoption("bench_threshold"),
+        update=config.getoption("bench_update"),
+    )
+
+    def benchmark_(name, func):
+        error = recorder.run(name, func)
+        if error:
+            pytest.fail(error, pytrace=False)
+
+    yield benchmark_
+    if recorder.update:
+        recorder.write_baselines()
+    config.benchmark_rows = list(recorder.rows())
+
+
+@pytest.fixture(scope="session")
+def async_rest_client(request, rest_client):
+    client = AsyncClient(
+        rest_client, concurrency=request.config.getoption("concurrency")
+    )
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def fan_out(async_rest_client, reseed_payloads):
+    """Issue the requests of every selected case of a parametrized test at once.
+
+    The first case to call ``fan_out(request, send)`` runs the ``send``
+    coroutine for all of its selected siblings concurrently; each case then
+    gets its own response (or re-raises its own exception) in test order.
+    """
+    batches = {}
+
+    def fan_out_(request, send):
+        node = request.node
+        key = (node.module.__name__, node.originalname)
+        if key not in batches:
+            siblings = [
+                item
+                for item in request.session.items
+                if getattr(item, "module", None) is node.module
+                and getattr(item, "originalname", None) == node.originalname
+                and hasattr(item, "callspec")
+            ]
+
+            async def send_as(item):
+                # runs up to the first await before the next case starts
+                reseed_payloads(item)
+                return await send(async_rest_client, **item.callspec.params)
+
+            results = async_rest_client.gather(*(send_as(item) for item in siblings))
+            batches[key] = {
+                item.callspec.id: result for item, result in zip(siblings, results)
+            }
+        result = batches[key].pop(node.callspec.id)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return fan_out_
 
 
 @pytest.fixture(scope="session", autouse=True)
 def response_is_json():
-    def response_is_json_(response):
-        return response.headers["Content-Type"] == "application/json; charset=utf-8"
+    return is_json
+
 
-    return response_is_json_
+def _record_ids(records):
+    # records without an id fail the schema test instead
+    return (r["id"] for r in records if isinstance(r, dict) and "id" in r)
 
 
 @pytest.fixture(scope="session")
-def validate_jsonschema(request):
-    pytest_verbose_mode = request.config.getoption("verbose") > 0
-    truncated_instance_max_length = 300
+def check_collection(request, rest_client, response_is_json, validators):
+    """Fetch a collection once for both its schema and its unique-ids test.
 
+    Reads the first page, or every page with --full-crawl, restarting a crawl
+    that saw the collection change. Records are checked against ``schema``
+    and for repeated ids as they are decoded. Returns ``(failure, detector)``:
+    the ``ValidationFailure`` of the first invalid record or None, and the
+    ``DuplicateDetector`` whose ``duplicates`` map each repeated id to the
+    pages it was seen on.
+    """
+    full_crawl = request.config.getoption("full_crawl")
+    window = request.config.getoption("concurrency")
+
+    def first_page(endpoint, detector):
+        response = rest_client.get(endpoint, stream=True)
+        with contextlib.closing(response):
+            assert response.status_code == 200
+            assert response_is_json(response)
+            for record in iter_json_array(response.iter_content(STREAM_CHUNK_SIZE)):
+                detector.add_page(1, _record_ids((record,)))
+                yield record
+
+    def all_pages(crawler, detector):
+        for page, records in crawler.iter_pages():
+            detector.add_page(page, _record_ids(records))
+            yield from records
+
+    def check(records, schema):
+        failure = validate_array_stream(records, validators.get(schema))
+        # the records after an invalid one still have their ids checked
+        for _ in records:
+            pass
+        return failure
+
+    def check_collection_(endpoint, schema):
+        if not full_crawl:
+            with DuplicateDetector() as detector:
+                failure = check(first_page(endpoint, detector), schema)
+            return failure, detector
+
+        for _ in range(CRAWL_ATTEMPTS):
+            crawler = CollectionCrawler(rest_client, endpoint, window=window)
+            with DuplicateDetector() as detector:
+                failure = check(all_pages(crawler, detector), schema)
+            if not crawler.drift:
+                return failure, detector
+        warnings.warn(
+            f"{endpoint} kept changing while it was crawled, records may be"
+            f" repeated or missing: {crawler.drift[:3]}"
+        )
+        return failure, detector
+
+    return check_collection_
+
+
+@pytest.fixture(scope="session")
+def validators(request):
+    return ValidatorRegistry(
+        fast_path=not request.config.getoption("no_fast_validators")
+    )
+
+
+@pytest.fixture(scope="session")
+def fail_validation(request):
+    # failures show the offending subtrees only, truncated unless verbose
+    verbose = request.config.getoption("verbose") > 0
+    max_chars = VERBOSE_MAX_CHARS if verbose else MAX_CHARS
+
+    def fail_validation_(failure):
+        pytest.fail(failure.render(max_chars), pytrace=False)
+
+    return fail_validation_
+
+
+@pytest.fixture(scope="session")
+def validate_jsonschema(validators, fail_validation):
     def validate_jsonschema_(instance, schema):
-        validator = jsonschema.Draft7Validator(schema)
-        errors = sorted(validator.iter_errors(instance), key=lambda e: e.path)
+        validator = validators.get(schema)
+        if validator.is_valid(instance):
+            return
+        errors, more = collect_errors(validator, instance)
         if errors:
-            errors_list = map(lambda e: f"{list(e.path)} -> {e.message}", errors)
-            errors_list_as_str = "\n".join(errors_list)
-            instance_as_str = json.dumps(instance, indent=2)
-            if not pytest_verbose_mode:
-                instance_as_str = instance_as_str[:truncated_instance_max_length] + (
-                    "...\n[TRUNCATED] (pass -v to show)\n"
-                    if len(instance_as_str) > truncated_instance_max_length
-                    else ""
-                )
-            errors_msg = (
-                "Instance:\n"
-                f"{instance_as_str}\n\n"
-                "JSON schema validation errors:\n"
-                f"{errors_list_as_str}"
-                "\n------------------------------------------------\n"
-            )
-            pytest.fail(errors_msg, pytrace=False)
+            fail_validation(ValidationFailure(instance, errors, more=more))
 
     return validate_jsonschema_
 
 
-@pytest.fixture(scope="session")
-def fake(request):
-    faker_instance = Faker()
+SCHEMAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+
+
+def load_schema(name):
+    with open(os.path.join(SCHEMAS_DIR, f"{name}.json")) as f:
+        return json.load(f)
 
+
+def make_payloads(config, stream=None):
+    shard = config.shard
+    worker_index = shard[0] if shard else None
+
+    seed = None
     FAKER_SEED = os.environ.get("FAKER_SEED")
     if FAKER_SEED:
         if not FAKER_SEED.isdigit():
             pytest.exit("FAKER_SEED environment variable must be an integer.\n")
-        seed = int(FAKER_SEED)
-        faker_instance.seed_instance(seed)
-    return faker_instance
+        seed = worker_seed(int(FAKER_SEED), worker_index, stream)
+
+    # Tag emails so parallel workers and separate streams never collide
+    tags = [f"w{worker_index}"] if worker_index is not None else []
+    if stream:
+        tags.append(stream)
+    return PayloadFactory(load_schema, seed=seed, tag=".".join(tags) or None)
+
+
+def new_user_data(payloads, email=None):
+    data = payloads("user").next()
+    if email is not None:
+        data["email"] = email
+    return data
+
+
+@pytest.fixture(scope="session")
+def payloads(request):
+    return make_payloads(request.config)
+
+
+@pytest.fixture(scope="session")
+def reseed_payloads(request, payloads):
+    """Reseed ``payloads`` from FAKER_SEED and a test item when using cassettes.
+
+    Generated bodies then depend only on the test that sends them, not on
+    which other tests ran before it, so a subset of a recorded run replays.
+    The test is identified by its file name and name rather than its node
+    id, which changes with the rootdir pytest picks for the command line.
+    """
+
+    def reseed_payloads_(item):
+        if request.config.cassette is None:
+            return
+        shard = request.config.shard
+        worker_index = shard[0] if shard else None
+        seed = int(os.environ["FAKER_SEED"])
+        stream = f"{item.path.name}::{item.name}"
+        payloads.reseed(worker_seed(seed, worker_index, stream))
+
+    return reseed_payloads_
+
+
+@pytest.fixture(autouse=True)
+def reseed_payloads_per_test(request):
+    if request.config.cassette is not None:
+        request.getfixturevalue("reseed_payloads")(request.node)
 
 
 @pytest.fixture(scope="session")
 def get_schema():
     schemas_cache = {}
-    this_dir_path = os.path.dirname(os.path.abspath(__file__))
-    
 
     def get_schema_(name):
-        if name in schemas_cache:
-            return schemas_cache[name]
-
-        schema_path = os.path.join(this_dir_path, "schemas", f"{name}.json")
-        with open(schema_path) as f:
-            schema = json.load(f)
-            schemas_cache[name] = schema
-            return schema
+        if name not in schemas_cache:
+            schemas_cache[name] = load_schema(name)
+        return schemas_cache[name]
 
     return get_schema_
 
 
+@pytest.fixture(scope="session")
+def user_data(payloads):
+    def user_data_(email=None):
+        return new_user_data(payloads, email)
+
+    return user_data_
+
+
+@pytest.fixture(scope="session")
+def user_pool(request, rest_client):
+    size = request.config.getoption("user_pool_size")
+    # Which pooled user a test gets is not reproducible, cassettes need it to be
+    if size <= 0 or request.config.cassette is not None:
+        yield None
+        return
+    # A separate payload stream keeps `payloads` reproducible while the pool
+    # refills in the background
+    pool_payloads = make_payloads(request.config, stream="pool")
+    pool = UserPool(
+        rest_client,
+        lambda: new_user_data(pool_payloads),
+        size,
+        concurrency=request.config.getoption("concurrency"),
+    )
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def start_user_pool(request):
+    if any("create_user" in item.fixturenames for item in request.session.items):
+        pool = request.getfixturevalue("user_pool")
+        if pool is not None:
+            pool.start()
+
+
 @pytest.fixture
-def create_user(rest_client, response_is_json, get_schema, fake, validate_jsonschema):
+def create_user(rest_client, response_is_json, user_data, user_pool):
     def create_user_(email=None):
-        if email is None:
-            email = fake.email()
-        data = {
-            "name": fake.name(),
-            "email": email,
-            "gender": fake.random_element(["male", "female"]),
-            "status": fake.random_element(["active", "inactive"]),
-        }
+        if email is None and user_pool is not None:
+            return user_pool.acquire()
+        data = user_data(email)
         response = rest_client.post("/users", data=data)
         assert response.status_code == 201
         assert response_is_json(response)
         result = response.json()
         return result["id"]
-    return create_user_
\ No newline at end of file
+    return create_user_
+
+
+@pytest.fixture(scope="session")
+def shared_user(request, rest_client, response_is_json):
+    """Id of one user shared by all the tests that don't change it.
+
+    Its payload comes from a stream of its own, so a cassette sees the same
+    request whichever test happens to create it.
+    """
+    data = new_user_data(make_payloads(request.config, stream="shared-user"))
+    response = rest_client.post("/users", data=data)
+    assert response.status_code == 201
+    assert response_is_json(response)
+    return response.json()["id"]
+
+
+@pytest.fixture
+def existing_user(request):
+    """Id of a user for tests that only need one to exist.
+
+    Tests marked ``@pytest.mark.mutates("user")`` change their user and get
+    a fresh one from ``create_user``; all others share ``shared_user``.
+    """
+    marker = request.node.get_closest_marker("mutates")
+    if marker is not None and "user" in marker.args:
+        return request.getfixturevalue("create_user")()
+    return request.getfixturevalue("shared_user")
@@ -0,0 +1,96 @@
+"""Microbenchmarks with stored baselines.
+
+Timings are divided by the time of a fixed pure-Python calibration loop
+measured in the same process right before each benchmark. The stored
+numbers are therefore "calibration units" rather than seconds, and a
+baseline recorded on one machine still means something on a faster or
+slower CI runner. A benchmark fails when it is more than ``threshold``
+slower than its baseline in two measurements in a row.
+"""
+
+import json
+import os
+import time
+
+MIN_TIME = 0.05
+REPEAT = 5
+
+
+def _calibration_loop():
+    total = 0
+    values = {}
+    for i in range(2000):
+        values[i & 63] = total
+        total += i * 3 % 7
+    return total
+
+
+def measure(func, min_time=MIN_TIME, repeat=REPEAT):
+    """Best per-call time of ``func`` in seconds, like ``timeit.autorange``."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed * 2 >= min_time else 10
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+class BenchmarkRecorder:
+    def __init__(self, baseline_path, threshold=0.25, update=False):
+        self.baseline_path = baseline_path
+        self.threshold = threshold
+        self.update = update
+        self.baselines = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                self.baselines = json.load(f)["benchmarks"]
+        self.results = {}
+
+    def _measure(self, name, func):
+        # recalibrated every time, the machine's speed can drift during a run
+        unit = measure(_calibration_loop)
+        seconds = measure(func)
+        self.results[name] = (seconds, seconds / unit)
+        return seconds / unit
+
+    def run(self, name, func):
+        """Measure ``func``; return an error message if it regressed."""
+        units = self._measure(name, func)
+        baseline = self.baselines.get(name)
+        if self.update or baseline is None:
+            return None
+        limit = baseline * (1 + self.threshold)
+        if units > limit:
+            # confirm, a single slow measurement is usually a noisy neighbour
+            units = self._measure(name, func)
+        if units > limit:
+            return (
+                f"{name} regressed: {units:.3f} calibration units per call,"
+                f" baseline {baseline:.3f} (+{units / baseline - 1:.0%},"
+                f" threshold {self.threshold:.0%})"
+            )
+        return None
+
+    def write_baselines(self):
+        baselines = {**self.baselines}
+        for name, (_, units) in self.results.items():
+            baselines[name] = float(f"{units:.4g}")
+        with open(self.baseline_path, "w") as f:
+            json.dump({"benchmarks": dict(sorted(baselines.items()))}, f, indent=2)
+            f.write("\n")
+
+    def rows(self):
+        for name, (seconds, units) in self.results.items():
+            baseline = self.baselines.get(name)
+            change = f"{units / baseline - 1:+.0%}" if baseline else "new"
+            yield f"{name:<45} {seconds * 1e6:10.2f} us {units:9.3f} units {change:>6}"
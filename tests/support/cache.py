@@ -0,0 +1,131 @@
+"""Shared GET response cache for ``rest_client``.
+
+Responses are keyed by path and canonical query parameters and kept for
+``ttl`` seconds, at most ``max_entries`` of them in LRU order. Once stale,
+an entry that came with an ``ETag`` is revalidated with ``If-None-Match``,
+and a ``304`` renews it without downloading the body again.
+
+Writes invalidate the resource family they touch: the last collection name
+in their path, so ``POST /users/1/posts`` drops cached ``/posts`` and
+``/users/{id}/posts`` pages. Deleting a user also drops its posts and
+todos, which GoREST deletes with it. Each family has a generation counter,
+so a read that was in flight during a write cannot store what it fetched.
+"""
+
+import collections
+import threading
+import time
+
+from support.cleanup import COLLECTIONS
+
+# families whose records disappear when a record of the key family is deleted
+CASCADES = {"users": ("posts", "todos")}
+
+
+def resource_family(endpoint):
+    segments = endpoint.split("?", 1)[0].strip("/").split("/")
+    for segment in reversed(segments):
+        if segment in COLLECTIONS:
+            return segment
+    return None
+
+
+def written_families(method, endpoint):
+    """The resource families a ``method`` request to ``endpoint`` changes."""
+    family = resource_family(endpoint)
+    families = {family}
+    if method == "DELETE":
+        families.update(CASCADES.get(family, ()))
+    return families
+
+
+def cache_key(endpoint, params):
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return endpoint, tuple(items)
+
+
+class CacheEntry:
+    __slots__ = ("response", "etag", "expires", "family")
+
+    def __init__(self, response, etag, expires, family):
+        self.response = response
+        self.etag = etag
+        self.expires = expires
+        self.family = family
+
+
+class ResponseCache:
+    def __init__(self, ttl=30.0, max_entries=256, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries = collections.OrderedDict()
+        self.generations = collections.Counter()
+        self.hits = 0
+        self.revalidated = 0
+        self.fetched = 0
+
+    def lookup(self, endpoint, params):
+        """Return ``(fresh_response, stale_entry, generation)``.
+
+        ``fresh_response`` is set on a hit. Otherwise ``stale_entry`` is the
+        expired entry to revalidate, if any, and ``generation`` must be
+        passed back to :meth:`store`.
+        """
+        key = cache_key(endpoint, params)
+        family = resource_family(endpoint)
+        with self.lock:
+            generation = self.generations[family]
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, None, generation
+            self.entries.move_to_end(key)
+            if entry.expires > self.clock():
+                self.hits += 1
+                return entry.response, None, generation
+            if entry.etag is None:
+                del self.entries[key]
+                return None, None, generation
+            return None, entry, generation
+
+    def store(self, endpoint, params, response, generation):
+        """Keep a fetched response, unless its family was written meanwhile."""
+        key = cache_key(endpoint, params)
+        family = resource_family(endpoint)
+        with self.lock:
+            self.fetched += 1
+            if response.status_code != 200 or self.generations[family] != generation:
+                return
+            self.entries[key] = CacheEntry(
+                response,
+                response.headers.get("ETag"),
+                self.clock() + self.ttl,
+                family,
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def renew(self, entry, generation):
+        """Mark a stale entry fresh again after a ``304``."""
+        with self.lock:
+            if self.generations[entry.family] != generation:
+                return False
+            entry.expires = self.clock() + self.ttl
+            self.revalidated += 1
+            return True
+
+    def invalidate(self, method, endpoint):
+        families = written_families(method, endpoint)
+        with self.lock:
+            for family in families:
+                self.generations[family] += 1
+            for key in [k for k, e in self.entries.items() if e.family in families]:
+                del self.entries[key]
+
+    def summary(self):
+        return (
+            f"{self.hits} hits, {self.revalidated} revalidated,"
+            f" {self.fetched} fetched, {len(self.entries)} cached"
+        )
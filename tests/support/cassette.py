@@ -0,0 +1,271 @@
+"""Record/replay of HTTP interactions for ``rest_client``.
+
+A cassette is a directory with three files:
+
+``interactions.jsonl``
+    Append-only data file, one compact JSON record per interaction.
+``interactions.idx``
+    Memory-mapped open-addressing hash table mapping an interaction key to
+    the offset and length of its record, so lookups are O(1) without
+    loading the data file.
+``meta.json``
+    The Faker seed used while recording, reused on replay so that
+    generated request bodies are identical.
+
+An interaction key is a digest of the method, the URL path, the canonical
+query string, a hash of the canonical JSON body and the number of times the
+same request was already seen in the run; repeated identical requests
+replay the responses they got, in order.
+"""
+
+import base64
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DATA_FILE = "interactions.jsonl"
+INDEX_FILE = "interactions.idx"
+META_FILE = "meta.json"
+
+MAGIC = b"GRCI"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQ")  # magic, version, capacity, count
+SLOT = struct.Struct("<16sQI4x")  # key digest, offset, length
+EMPTY_KEY = bytes(16)
+INITIAL_CAPACITY = 1024
+MAX_LOAD = 0.6
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+def canonical_body(body):
+    if not body:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+
+def request_signature(method, url, body):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    body_hash = hashlib.sha256(canonical_body(body)).hexdigest()
+    return method.upper(), parts.path, query, body_hash
+
+
+def key_digest(signature, occurrence):
+    raw = "\0".join((*signature, str(occurrence))).encode()
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class MmapIndex:
+    """Fixed-slot hash table stored in a memory-mapped file."""
+
+    def __init__(self, path, writable):
+        self.path = path
+        self.writable = writable
+        if writable and not os.path.exists(path):
+            self.create(path, INITIAL_CAPACITY)
+        self._open()
+
+    @staticmethod
+    def create(path, capacity):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, capacity, 0))
+            f.truncate(HEADER.size + capacity * SLOT.size)
+
+    def _open(self):
+        mode = "r+b" if self.writable else "rb"
+        self.file = open(self.path, mode)
+        access = mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ
+        self.map = mmap.mmap(self.file.fileno(), 0, access=access)
+        magic, version, self.capacity, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a cassette index")
+
+    def _slot_offset(self, key):
+        slot = int.from_bytes(key[:8], "little") % self.capacity
+        while True:
+            position = HEADER.size + slot * SLOT.size
+            yield position
+            slot = (slot + 1) % self.capacity
+
+    def get(self, key):
+        for position in self._slot_offset(key):
+            slot_key, offset, length = SLOT.unpack_from(self.map, position)
+            if slot_key == key:
+                return offset, length
+            if slot_key == EMPTY_KEY:
+                return None
+
+    def put(self, key, offset, length):
+        if (self.count + 1) > self.capacity * MAX_LOAD:
+            self._grow()
+        for position in self._slot_offset(key):
+            slot_key = self.map[position : position + 16]
+            if slot_key == EMPTY_KEY or slot_key == key:
+                if slot_key == EMPTY_KEY:
+                    self.count += 1
+                    HEADER.pack_into(
+                        self.map, 0, MAGIC, VERSION, self.capacity, self.count
+                    )
+                SLOT.pack_into(self.map, position, key, offset, length)
+                return
+
+    def items(self):
+        for slot in range(self.capacity):
+            key, offset, length = SLOT.unpack_from(
+                self.map, HEADER.size + slot * SLOT.size
+            )
+            if key != EMPTY_KEY:
+                yield key, offset, length
+
+    def _grow(self):
+        tmp_path = f"{self.path}.tmp"
+        self.create(tmp_path, self.capacity * 2)
+        grown = MmapIndex(tmp_path, writable=True)
+        for key, offset, length in self.items():
+            grown.put(key, offset, length)
+        grown.close()
+        self.close()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def close(self):
+        if self.writable:
+            self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+class Cassette:
+    def __init__(self, path, mode):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.occurrences = {}
+        data_path = os.path.join(path, DATA_FILE)
+        index_path = os.path.join(path, INDEX_FILE)
+        if mode == "record":
+            os.makedirs(path, exist_ok=True)
+            for stale in (data_path, index_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            self.data = open(data_path, "ab")
+            self.index = MmapIndex(index_path, writable=True)
+        else:
+            self.data = open(data_path, "rb")
+            self.data_map = (
+                mmap.mmap(self.data.fileno(), 0, access=mmap.ACCESS_READ)
+                if os.path.getsize(data_path)
+                else b""
+            )
+            self.index = MmapIndex(index_path, writable=False)
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, INDEX_FILE))
+
+    def read_meta(self):
+        with open(os.path.join(self.path, META_FILE)) as f:
+            return json.load(f)
+
+    def write_meta(self, meta):
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    def next_key(self, signature):
+        with self.lock:
+            occurrence = self.occurrences.get(signature, 0)
+            self.occurrences[signature] = occurrence + 1
+        return key_digest(signature, occurrence)
+
+    def record(self, key, signature, response):
+        method, path, query, _ = signature
+        record = {
+            "method": method,
+            "path": path,
+            "query": query,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode(),
+        }
+        raw = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with self.lock:
+            offset = self.data.tell()
+            self.data.write(raw)
+            self.data.flush()
+            self.index.put(key, offset, len(raw))
+
+    def lookup(self, key):
+        location = self.index.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        return json.loads(self.data_map[offset : offset + length])
+
+    def close(self):
+        self.index.close()
+        if self.mode == "replay" and self.data_map:
+            self.data_map.close()
+        self.data.close()
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter recording to, or replaying from, a cassette."""
+
+    def __init__(self, cassette, adapter=None):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        signature = request_signature(request.method, request.url, request.body)
+        key = self.cassette.next_key(signature)
+        if self.cassette.mode == "record":
+            response = self.adapter.send(request, **kwargs)
+            self.cassette.record(key, signature, response)
+            return response
+
+        record = self.cassette.lookup(key)
+        if record is None:
+            method, path, query, _ = signature
+            raise CassetteMiss(
+                f"no recorded interaction for {method} {path}"
+                f"{'?' + query if query else ''} in {self.cassette.path}"
+            )
+        return self.build_response(request, record)
+
+    @staticmethod
+    def build_response(request, record):
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record["reason"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response._content = base64.b64decode(record["body"])
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        self.adapter.close()
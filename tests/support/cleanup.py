@@ -0,0 +1,142 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+COLLECTIONS = ("users", "posts", "todos")
+
+
+def resource_path(endpoint, result):
+    """Map a create endpoint and its response body to the resource path.
+
+    ``/users`` -> ``/users/{id}``, ``/users/{user_id}/posts`` ->
+    ``/posts/{id}`` and so on. Returns ``None`` for unknown endpoints.
+    """
+    collection = endpoint.rstrip("/").rsplit("/", 1)[-1]
+    if collection not in COLLECTIONS or not isinstance(result, dict):
+        return None
+    resource_id = result.get("id")
+    if not isinstance(resource_id, int):
+        return None
+    return f"/{collection}/{resource_id}"
+
+
+def owner_id(endpoint, result):
+    """Id of the user a created post or todo belongs to, or ``None``."""
+    parts = endpoint.strip("/").split("/")
+    if len(parts) == 3 and parts[0] == "users" and parts[1].isdigit():
+        return int(parts[1])
+    owner = result.get("user_id")
+    return owner if isinstance(owner, int) else None
+
+
+class ResourceTracker:
+    """Thread-safe record of the resources created through ``rest_client``.
+
+    ``paths`` maps each resource path to the id of the user owning it, since
+    deleting a user deletes their posts and todos with it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.paths = {}
+        self.created = 0
+
+    def record(self, endpoint, response):
+        if response.status_code != 201:
+            return
+        try:
+            result = response.json()
+        except ValueError:
+            return
+        path = resource_path(endpoint, result)
+        if path is not None:
+            owner = None
+            if not path.startswith("/users/"):
+                owner = owner_id(endpoint, result)
+            with self.lock:
+                self.paths[path] = owner
+                self.created += 1
+
+    def forget(self, endpoint, response):
+        if response.status_code not in (204, 404):
+            return
+        path = endpoint.rstrip("/")
+        collection, _, resource_id = path.strip("/").partition("/")
+        with self.lock:
+            self.paths.pop(path, None)
+            if collection == "users" and resource_id.isdigit():
+                user_id = int(resource_id)
+                for child, owner in list(self.paths.items()):
+                    if owner == user_id:
+                        del self.paths[child]
+
+    def pending(self):
+        with self.lock:
+            return list(self.paths)
+
+    def owners(self):
+        """Pending paths mapped to the id of their owning user, if any."""
+        with self.lock:
+            return dict(self.paths)
+
+
+class DeletionQueue:
+    """Delete tracked resources with bounded parallelism.
+
+    Posts and todos whose user is queued as well are left to the user's
+    deletion, which takes them with it, so each user's children cost no
+    requests and nothing is deleted twice.
+    """
+
+    def __init__(self, client, tracker, concurrency=8):
+        self.client = client
+        self.tracker = tracker
+        self.concurrency = concurrency
+        self.deleted = 0
+        self.cascaded = 0
+        self.gone = 0
+        self.leaked = []
+
+    def _delete(self, path):
+        try:
+            response = self.client.delete(path)
+        except Exception as exc:
+            return path, None, f"{type(exc).__name__}: {exc}"
+        if response.status_code in (204, 404):
+            return path, response.status_code, None
+        return path, None, f"{response.status_code} {response.text[:200]}"
+
+    def drain(self):
+        owners = self.tracker.owners()
+        paths = []
+        children = {}
+        for path, owner in owners.items():
+            user = f"/users/{owner}"
+            if owner is not None and user in owners:
+                children.setdefault(user, []).append(path)
+            else:
+                paths.append(path)
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="cleanup"
+        ) as executor:
+            for path, status, error in executor.map(self._delete, paths):
+                cascaded = children.get(path, ())
+                if status == 204:
+                    self.deleted += 1
+                    self.cascaded += len(cascaded)
+                elif status == 404:
+                    self.gone += 1
+                    self.cascaded += len(cascaded)
+                else:
+                    self.leaked.append((path, error))
+                    self.leaked.extend(
+                        (child, f"not deleted with {path}") for child in cascaded
+                    )
+        return self
+
+    def summary(self):
+        return (
+            f"{self.tracker.created} created, {self.deleted} deleted at teardown"
+            f" ({self.cascaded} more with their user), {self.gone} already gone,"
+            f" {len(self.leaked)} leaked"
+        )
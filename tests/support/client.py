@@ -0,0 +1,230 @@
+import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from support.cache import cache_key, resource_family, written_families
+
+
+class Client:
+    def __init__(
+        self,
+        base_url,
+        token,
+        tracker=None,
+        scheduler=None,
+        timeout=None,
+        metrics=None,
+        cache=None,
+        coalescer=None,
+        request_log=None,
+        hedger=None,
+    ):
+        self.base_url = base_url
+        self.token = token
+        self.tracker = tracker
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.metrics = metrics
+        self.cache = cache
+        self.coalescer = coalescer
+        self.request_log = request_log
+        self.hedger = hedger
+        self.auth_headers = {"Authorization": f"Bearer {token}"}
+        # writes per resource family, so GETs don't coalesce across a write
+        self.write_lock = threading.Lock()
+        self.writes = collections.Counter()
+        # requests and asyncio are slow to import, so they are loaded by the
+        # first client instead of with this module
+        import requests
+
+        self.session = requests.Session()
+        self.local = threading.local()
+        self.local.session = self.session
+
+    def thread_session(self):
+        """The calling thread's ``requests.Session``.
+
+        ``requests.Session`` isn't thread-safe: every request updates its
+        cookie jar. Each thread gets a session of its own, sharing the
+        headers and adapters, and so the connection pool, of ``session``.
+        Those are only changed while the client is set up.
+        """
+        session = getattr(self.local, "session", None)
+        if session is None:
+            import requests
+
+            session = self.local.session = requests.Session()
+            session.headers = self.session.headers
+            session.adapters = self.session.adapters
+        return session
+
+    def _request(self, method, endpoint, **kwargs):
+        url = f"{self.base_url}{endpoint}"
+        kwargs.setdefault("timeout", self.timeout)
+        stream = kwargs.get("stream", False)
+
+        def send_request():
+            return self.thread_session().request(method, url, **kwargs)
+
+        if self.metrics is not None:
+            send_request = self.metrics.timed(
+                method, endpoint, send_request, stream=stream
+            )
+        if self.scheduler is None:
+            response = send_request()
+        else:
+            response = self.scheduler.send(method, send_request)
+        if self.request_log is not None:
+            self.request_log.record(
+                method, endpoint, kwargs.get("json"), response, stream=stream
+            )
+        return response
+
+    def get(self, endpoint, params=None, stream=False):
+        """With ``stream=True`` the body is left unread; close the response.
+
+        Streamed responses are cached once their body has been read to the
+        end, and cached ones are replayed from memory by ``iter_content``.
+        They are never coalesced or hedged.
+        """
+        params = params or {}
+        stale = generation = None
+        if self.cache is not None:
+            cached, stale, generation = self.cache.lookup(endpoint, params)
+            if cached is not None:
+                return cached
+        if stream:
+            return self._fetch_stream(endpoint, params, stale, generation)
+
+        def fetch():
+            return self._fetch(endpoint, params, stale, generation)
+
+        if self.coalescer is None:
+            return fetch()
+        # concurrent identical GETs share one request and its response, but
+        # a GET sent after a write never gets the response of one sent before
+        etag = stale.etag if stale is not None else None
+        with self.write_lock:
+            written = self.writes[resource_family(endpoint)]
+        key = (cache_key(endpoint, params), etag, written)
+        return self.coalescer.do(key, fetch)
+
+    def _fetch(self, endpoint, params, stale, generation):
+        headers = {"If-None-Match": stale.etag} if stale is not None else None
+
+        def send():
+            return self._request("GET", endpoint, params=params, headers=headers)
+
+        response = send() if self.hedger is None else self.hedger.do(endpoint, send)
+        if self.cache is None:
+            return response
+        if response.status_code == 304 and stale is not None:
+            self.cache.renew(stale, generation)
+            return stale.response
+        self.cache.store(endpoint, params, response, generation)
+        return response
+
+    def _fetch_stream(self, endpoint, params, stale, generation):
+        headers = {"If-None-Match": stale.etag} if stale is not None else None
+        response = self._request(
+            "GET", endpoint, params=params, headers=headers, stream=True
+        )
+        if self.cache is None:
+            return response
+        if response.status_code == 304 and stale is not None:
+            response.close()
+            self.cache.renew(stale, generation)
+            return stale.response
+        if response.status_code == 200:
+            self._store_when_read(endpoint, params, response, generation)
+        return response
+
+    def _store_when_read(self, endpoint, params, response, generation):
+        # keeps the chunks as the caller reads them, and caches the response
+        # once it has read all of them, like a response read in one go
+        iter_content = response.iter_content
+
+        def iter_content_(chunk_size=1, decode_unicode=False):
+            if decode_unicode:
+                yield from iter_content(chunk_size, decode_unicode)
+                return
+            chunks = []
+            for chunk in iter_content(chunk_size):
+                chunks.append(chunk)
+                yield chunk
+            del response.iter_content
+            response._content = b"".join(chunks)
+            response._content_consumed = True
+            self.cache.store(endpoint, params, response, generation)
+
+        response.iter_content = iter_content_
+
+    def _write(self, method, endpoint, **kwargs):
+        response = self._request(method, endpoint, headers=self.auth_headers, **kwargs)
+        with self.write_lock:
+            for family in written_families(method, endpoint):
+                self.writes[family] += 1
+        if self.cache is not None:
+            self.cache.invalidate(method, endpoint)
+        return response
+
+    def post(self, endpoint, data):
+        response = self._write("POST", endpoint, json=data)
+        if self.tracker is not None:
+            self.tracker.record(endpoint, response)
+        return response
+
+    def put(self, endpoint, data):
+        return self._write("PUT", endpoint, json=data)
+
+    def delete(self, endpoint):
+        response = self._write("DELETE", endpoint)
+        if self.tracker is not None:
+            self.tracker.forget(endpoint, response)
+        return response
+
+
+class AsyncClient:
+    """asyncio facade over a :class:`Client` with the same request surface.
+
+    Blocking calls run on a dedicated thread pool, so up to ``concurrency``
+    requests are in flight at once while callers simply ``await`` them.
+    Each pool thread sends through its own session, see
+    :meth:`Client.thread_session`.
+    """
+
+    def __init__(self, client, concurrency=16):
+        self.client = client
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="rest-client"
+        )
+
+    async def _call(self, method, *args):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, method, *args)
+
+    async def get(self, endpoint, params=None):
+        return await self._call(self.client.get, endpoint, params)
+
+    async def post(self, endpoint, data):
+        return await self._call(self.client.post, endpoint, data)
+
+    async def put(self, endpoint, data):
+        return await self._call(self.client.put, endpoint, data)
+
+    async def delete(self, endpoint):
+        return await self._call(self.client.delete, endpoint)
+
+    def gather(self, *coros):
+        """Run ``coros`` concurrently, returning results or raised exceptions."""
+        import asyncio
+
+        async def gather_():
+            return await asyncio.gather(*coros, return_exceptions=True)
+
+        return asyncio.run(gather_())
+
+    def close(self):
+        self.executor.shutdown(wait=True)
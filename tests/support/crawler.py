@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CrawlError(Exception):
+    pass
+
+
+def _header_int(response, name):
+    try:
+        return int(response.headers[name])
+    except (KeyError, ValueError):
+        raise CrawlError(f"{response.url} has no valid {name} header") from None
+
+
+class CollectionCrawler:
+    """Walk every page of a paginated GoREST collection.
+
+    The first page tells how many pages there are; the rest are fetched
+    concurrently, at most ``window`` at a time, and yielded in page order
+    as soon as they are ready. Any page whose ``X-Pagination-Total`` or
+    ``X-Pagination-Pages`` differs from the first page's is recorded in
+    ``drift``: records were created or deleted during the walk, so some
+    may have shifted across page boundaries and been repeated or skipped.
+    A page shorter than ``per_page`` before the last one means records were
+    deleted, and the walk ends there instead of fetching empty pages.
+    """
+
+    def __init__(self, client, endpoint, per_page=100, window=8, params=None):
+        self.client = client
+        self.endpoint = endpoint
+        self.per_page = per_page
+        self.window = window
+        self.params = params or {}
+        self.total = None
+        self.pages = None
+        self.drift = []
+
+    def fetch(self, page):
+        params = {**self.params, "page": page, "per_page": self.per_page}
+        response = self.client.get(self.endpoint, params=params)
+        if response.status_code != 200:
+            raise CrawlError(
+                f"GET {self.endpoint} page {page} returned {response.status_code}"
+            )
+        return response
+
+    def check_drift(self, page, response):
+        total = _header_int(response, "X-Pagination-Total")
+        pages = _header_int(response, "X-Pagination-Pages")
+        if (total, pages) != (self.total, self.pages):
+            self.drift.append(
+                {
+                    "page": page,
+                    "expected_total": self.total,
+                    "total": total,
+                    "expected_pages": self.pages,
+                    "pages": pages,
+                }
+            )
+
+    def iter_pages(self):
+        """Yield ``(page_number, records)`` for every page, in order."""
+        self.drift = []
+        first = self.fetch(1)
+        self.total = _header_int(first, "X-Pagination-Total")
+        self.pages = _header_int(first, "X-Pagination-Pages")
+        records = first.json()
+        yield 1, records
+        if self.pages <= 1 or len(records) < self.per_page:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=self.window, thread_name_prefix="crawler"
+        ) as executor:
+            pending = {}
+            next_page = 2
+            for page in range(2, self.pages + 1):
+                # keep at most `window` requests in flight ahead of the reader
+                while next_page <= self.pages and len(pending) < self.window:
+                    pending[next_page] = executor.submit(self.fetch, next_page)
+                    next_page += 1
+                response = pending.pop(page).result()
+                self.check_drift(page, response)
+                records = response.json()
+                yield page, records
+                if len(records) < self.per_page:
+                    for future in pending.values():
+                        future.cancel()
+                    return
+
+    def __iter__(self):
+        for _, records in self.iter_pages():
+            yield from records
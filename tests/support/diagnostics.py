@@ -0,0 +1,111 @@
+"""Schema validation failure messages whose cost doesn't grow with the payload.
+
+Only the first ``MAX_ERRORS`` errors are collected from ``iter_errors``.
+Instead of the whole instance, the message shows the subtrees the errors
+are in, addressed by JSON path, and each is serialized lazily with
+``iterencode`` until ``max_chars`` characters have been produced, so a
+failing page of a large collection costs a few kilobytes to report.
+"""
+
+import itertools
+import json
+
+MAX_ERRORS = 20
+MAX_SUBTREES = 5
+MAX_CHARS = 300
+VERBOSE_MAX_CHARS = 10000
+
+_encoder = json.JSONEncoder(indent=2)
+
+
+def json_path(path):
+    """``[3, "email"]`` -> ``$[3].email``."""
+    return "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path)
+
+
+def _path_key(path):
+    # paths mix list indexes and property names, which don't compare
+    return [(isinstance(p, str), p) for p in path]
+
+
+def collect_errors(validator, instance, limit=MAX_ERRORS):
+    """``(errors, more)``: at most ``limit`` ``(path, message)`` pairs by path."""
+    found = list(itertools.islice(validator.iter_errors(instance), limit + 1))
+    errors = sorted(
+        ((list(e.path), e.message) for e in found[:limit]),
+        key=lambda error: _path_key(error[0]),
+    )
+    return errors, len(found) > limit
+
+
+def truncated_json(value, max_chars):
+    """``(text, truncated)``, serializing no more of ``value`` than needed."""
+    chunks = []
+    size = 0
+    # with indent set, iterencode is the pure-Python generator, not the
+    # C encoder that renders everything at once
+    for chunk in _encoder.iterencode(value):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_chars:
+            return "".join(chunks)[:max_chars], True
+    return "".join(chunks), False
+
+
+def offending_subtree(instance, path):
+    """Path and value of the object or array an error at ``path`` is in."""
+    value = instance
+    walked = []
+    parent = None
+    for key in path:
+        if not isinstance(value, (dict, list)):
+            break
+        try:
+            child = value[key]
+        except (KeyError, IndexError, TypeError):
+            break
+        parent = (list(walked), value)
+        walked.append(key)
+        value = child
+    if not isinstance(value, (dict, list)) and parent is not None:
+        return parent
+    return walked, value
+
+
+class ValidationFailure:
+    """A failed validation, rendered into a message only when reported.
+
+    ``root`` is the path of ``instance`` in the validated document, for
+    when only part of it was kept, like one item of a streamed array.
+    """
+
+    def __init__(self, instance, errors, root=(), more=False):
+        self.instance = instance
+        self.errors = errors
+        self.root = list(root)
+        self.more = more
+
+    def render(self, max_chars=MAX_CHARS):
+        lines = ["JSON schema validation errors:"]
+        subtrees = {}
+        for path, message in self.errors:
+            lines.append(f"{json_path(self.root + path)} -> {message}")
+            subtree_path, value = offending_subtree(self.instance, path)
+            subtrees.setdefault(tuple(subtree_path), value)
+        if self.more:
+            lines.append(f"(only the first {len(self.errors)} errors were collected)")
+
+        lines.append("")
+        lines.append("Offending values:")
+        truncated = False
+        for path, value in itertools.islice(subtrees.items(), MAX_SUBTREES):
+            text, cut = truncated_json(value, max_chars)
+            truncated = truncated or cut
+            lines.append(f"{json_path(self.root + list(path))}:")
+            lines.append(text + ("..." if cut else ""))
+        if len(subtrees) > MAX_SUBTREES:
+            lines.append(f"({len(subtrees) - MAX_SUBTREES} more not shown)")
+        if truncated and max_chars < VERBOSE_MAX_CHARS:
+            lines.append("[TRUNCATED] (pass -v to show more)")
+        lines.append("------------------------------------------------")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,128 @@
+"""Hedged GET requests for ``rest_client``.
+
+When a GET hasn't returned within the running p95 latency of its route, a
+duplicate is sent and whichever answers first is used. Until a route has
+``min_samples`` latencies, its GETs are sent normally. At most ``budget``
+of all GETs may be hedged, so the extra load stays marginal even when the
+API is slow across the board.
+
+The slower request can't be aborted mid-flight with requests, it is left
+to finish on its thread and its response is closed, which returns the
+connection to the pool. A hedge that wins is credited with the time the
+original request took beyond it.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from support.metrics import LatencyHistogram, route_template
+
+
+def _close(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+class Hedger:
+    def __init__(
+        self,
+        budget=0.05,
+        percentile=95,
+        min_samples=20,
+        max_workers=32,
+        clock=time.perf_counter,
+    ):
+        self.budget = budget
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.clock = clock
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="hedge")
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self.saved = 0.0
+
+    def threshold(self, route):
+        """Seconds to wait before hedging a GET of ``route``, or None."""
+        with self.lock:
+            histogram = self.histograms.get(route)
+            if histogram is None or histogram.count < self.min_samples:
+                return None
+            return histogram.percentile(self.percentile)
+
+    def _attempt(self, route, func):
+        started = self.clock()
+        result = func()
+        elapsed = self.clock() - started
+        with self.lock:
+            histogram = self.histograms.get(route)
+            if histogram is None:
+                histogram = self.histograms[route] = LatencyHistogram()
+            histogram.record(elapsed)
+        return result
+
+    def _take_hedge(self):
+        with self.lock:
+            if self.hedged + 1 > self.budget * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def do(self, endpoint, func):
+        """Call ``func``, a GET of ``endpoint``, hedging it if it is slow."""
+        route = route_template(endpoint)
+        with self.lock:
+            self.requests += 1
+        threshold = self.threshold(route)
+        if threshold is None:
+            return self._attempt(route, func)
+
+        primary = self.executor.submit(self._attempt, route, func)
+        try:
+            return primary.result(timeout=threshold)
+        except FutureTimeout:
+            pass
+        if not self._take_hedge():
+            return primary.result()
+        hedge = self.executor.submit(self._attempt, route, func)
+
+        done, _ = wait((primary, hedge), return_when=FIRST_COMPLETED)
+        first = primary if primary in done else hedge
+        other = hedge if first is primary else primary
+        if first.exception() is not None:
+            # the other one may still succeed
+            first, other = other, first
+            wait((first,))
+        if first is hedge and first.exception() is None:
+            self._credit(primary, self.clock())
+        else:
+            other.add_done_callback(_close)
+        return first.result()
+
+    def _credit(self, primary, won_at):
+        with self.lock:
+            self.won += 1
+
+        def settle(future):
+            _close(future)
+            if future.exception() is None:
+                with self.lock:
+                    self.saved += self.clock() - won_at
+
+        primary.add_done_callback(settle)
+
+    def summary(self):
+        with self.lock:
+            rate = self.hedged / self.requests if self.requests else 0.0
+            return (
+                f"{self.hedged} of {self.requests} hedged ({rate:.1%}),"
+                f" {self.won} hedges won, {self.saved * 1000:.0f} ms saved"
+            )
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,126 @@
+"""HTTP/2 transport for ``rest_client``, backed by httpx.
+
+With HTTP/2 every concurrent request becomes a stream on one multiplexed
+connection per host instead of taking its own pooled HTTP/1.1 socket, so a
+session opens one TLS handshake rather than ``--concurrency`` of them.
+``Http2Adapter`` is a requests transport adapter, so ``Client``, the
+scheduler, the metrics and cassettes work unchanged on top of it.
+
+httpx and h2 are optional: ``pip install 'httpx[http2]'``. HTTPS servers
+get HTTP/2 through ALPN and fall back to HTTP/1.1 if they don't offer it.
+Plain ``http://`` URLs stay on HTTP/1.1 unless ``prior_knowledge`` is set,
+as cleartext HTTP/2 can't be negotiated.
+"""
+
+import datetime
+import importlib.util
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+INSTALL_HINT = "pip install 'httpx[http2]'"
+
+
+def http2_available():
+    return all(importlib.util.find_spec(name) for name in ("httpx", "h2"))
+
+
+class _RawStream:
+    """``response.raw`` for streamed responses, as used by ``iter_content``."""
+
+    def __init__(self, response):
+        self.response = response
+
+    def stream(self, chunk_size, decode_content=True):
+        yield from self.response.iter_bytes(chunk_size)
+
+    def close(self):
+        self.response.close()
+
+    def release_conn(self):
+        self.response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """Transport adapter sending requests through an HTTP/2 ``httpx.Client``.
+
+    Connection setup isn't reported to the latency metrics, httpx opens its
+    own sockets.
+    """
+
+    def __init__(self, max_connections=16, prior_knowledge=False):
+        super().__init__()
+        import httpx
+
+        self.httpx = httpx
+        # connections beyond the first are only opened once a connection
+        # runs out of concurrent streams
+        self.client = httpx.Client(
+            http1=not prior_knowledge,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            follow_redirects=False,
+            trust_env=False,
+        )
+
+    def _timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self.httpx.Timeout(read, connect=connect)
+        return self.httpx.Timeout(timeout)
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        httpx = self.httpx
+        outgoing = self.client.build_request(
+            request.method,
+            request.url,
+            headers=list(request.headers.items()),
+            content=request.body,
+            timeout=self._timeout(timeout),
+        )
+        started = time.perf_counter()
+        try:
+            # returns once the headers are in, like urllib3 with preload off
+            incoming = self.client.send(outgoing, stream=True)
+            elapsed = time.perf_counter() - started
+            if not stream:
+                try:
+                    incoming.read()
+                finally:
+                    incoming.close()
+        except httpx.ConnectTimeout as exc:
+            raise ConnectTimeout(exc, request=request) from exc
+        except httpx.ReadTimeout as exc:
+            raise ReadTimeout(exc, request=request) from exc
+        except httpx.TransportError as exc:
+            raise ConnectionError(exc, request=request) from exc
+        return self.build_response(request, incoming, stream, elapsed)
+
+    @staticmethod
+    def build_response(request, incoming, stream, elapsed):
+        response = requests.Response()
+        response.status_code = incoming.status_code
+        response.reason = incoming.reason_phrase
+        response.headers = CaseInsensitiveDict(incoming.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=elapsed)
+        if stream:
+            response.raw = _RawStream(incoming)
+        else:
+            response._content = incoming.content
+            response._content_consumed = True
+        return response
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,272 @@
+"""Load generation from the suite's user journeys.
+
+``pytest --load`` skips the tests and instead runs virtual users that pick
+weighted scenarios chaining the journey steps of ``support.scenarios``
+that the tests run (create a user, add a post and a todo, update and
+delete it, browse the lists, send invalid payloads), assertions included.
+Requests go through the regular ``rest_client`` stack, so rate limiting,
+timeouts and the latency histograms all apply.
+"""
+
+import collections
+import random
+import threading
+import time
+
+from support import scenarios
+from support.payloads import RANDOM
+
+# Each step runs a journey step from support.scenarios, the one the test
+# module named in its docstring calls, with load-generated data.
+
+
+def create_user(ctx):
+    """test_create_user.py::test_create_user_ok"""
+    result = scenarios.create_user(ctx.client, ctx.payloads("user").next())
+    ctx.state["user_id"] = result["id"]
+
+
+def create_post(ctx):
+    """test_create_user_post.py::test_create_user_post_ok"""
+    user_id = ctx.state["user_id"]
+    data = {"user_id": user_id, **ctx.payloads("post").next()}
+    scenarios.create_user_post(ctx.client, user_id, data)
+
+
+def create_todo(ctx):
+    """test_create_user_todo.py::test_create_user_todo_ok"""
+    data = ctx.payloads("todo").next()
+    scenarios.create_user_todo(ctx.client, ctx.state["user_id"], data)
+
+
+def update_user(ctx):
+    """test_update_user.py::test_update_user_ok"""
+    data = ctx.payloads("user").fill({"name": RANDOM, "email": RANDOM})
+    scenarios.update_user(ctx.client, ctx.state["user_id"], data)
+
+
+def delete_user(ctx):
+    """test_delete_user.py::test_delete_user_ok"""
+    scenarios.delete_user(ctx.client, ctx.state.pop("user_id"))
+
+
+def _list(collection):
+    def list_(ctx):
+        scenarios.get_page(ctx.client, collection, ctx.rng.randint(1, 3), 5)
+
+    list_.__name__ = f"list_{collection}"
+    list_.__doc__ = f"test_get_{collection}.py::test_get_{collection}_pagination"
+    return list_
+
+
+list_users = _list("users")
+list_posts = _list("posts")
+list_todos = _list("todos")
+
+
+def create_user_invalid(ctx):
+    """test_create_user.py::test_create_user_invalid_data"""
+    variants = list(ctx.payloads("user").invalid_variants())
+    _, field, data = ctx.rng.choice(variants)
+    errors = scenarios.validation_errors(ctx.client.post("/users", data=data))
+    assert any(error.get("field") == field for error in errors)
+
+
+SCENARIOS = {
+    "journey": (
+        5,
+        (create_user, create_post, create_todo, update_user, delete_user),
+    ),
+    "browse": (3, (list_users, list_posts, list_todos)),
+    "invalid": (1, (create_user_invalid,)),
+}
+
+
+def parse_weights(values):
+    weights = {name: weight for name, (weight, _) in SCENARIOS.items()}
+    for value in values or ():
+        name, _, weight = value.partition("=")
+        if name not in SCENARIOS or not weight.isdigit():
+            raise ValueError(
+                f"invalid scenario weight {value!r}, expected one of"
+                f" {', '.join(SCENARIOS)} as NAME=WEIGHT"
+            )
+        weights[name] = int(weight)
+    if not any(weights.values()):
+        raise ValueError("all scenario weights are zero")
+    return weights
+
+
+class RatePacer:
+    """Spread requests evenly to hold a target requests-per-second rate."""
+
+    def __init__(self, rps):
+        self.interval = 1.0 / rps if rps else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class PacedClient:
+    """Client proxy waiting for the pacer before each request."""
+
+    def __init__(self, client, pacer):
+        self.client = client
+        self.pacer = pacer
+
+    def get(self, endpoint, params=None):
+        self.pacer.wait()
+        return self.client.get(endpoint, params=params)
+
+    def post(self, endpoint, data):
+        self.pacer.wait()
+        return self.client.post(endpoint, data=data)
+
+    def put(self, endpoint, data):
+        self.pacer.wait()
+        return self.client.put(endpoint, data=data)
+
+    def delete(self, endpoint):
+        self.pacer.wait()
+        return self.client.delete(endpoint)
+
+
+class VirtualUserContext:
+    def __init__(self, client, payloads, rng):
+        self.client = client
+        self.payloads = payloads
+        self.rng = rng
+        self.state = {}
+
+
+class LoadResults:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.iterations = collections.Counter()
+        self.failures = collections.Counter()
+        self.errors = collections.Counter()
+
+    def record(self, scenario, error=None):
+        with self.lock:
+            self.iterations[scenario] += 1
+            if error is not None:
+                self.failures[scenario] += 1
+                self.errors[error] += 1
+
+
+class LoadRunner:
+    """pytest plugin replacing the test run with a load run."""
+
+    def __init__(
+        self,
+        config,
+        open_api_target,
+        build_client,
+        make_payloads,
+        clean_up_resources,
+    ):
+        self.config = config
+        self.open_api_target = open_api_target
+        self.build_client = build_client
+        self.make_payloads = make_payloads
+        self.clean_up_resources = clean_up_resources
+        self.concurrency = config.getoption("load_concurrency")
+        self.duration = config.getoption("load_duration")
+        self.ramp_up = config.getoption("load_ramp_up")
+        self.rps = config.getoption("load_rps")
+        self.max_error_rate = config.getoption("load_max_error_rate")
+        self.weights = parse_weights(config.getoption("load_scenario"))
+        self.results = LoadResults()
+        self.elapsed = None
+
+    def virtual_user(self, index, client, started, deadline):
+        start_at = started + index * self.ramp_up / self.concurrency
+        time.sleep(max(0.0, start_at - time.monotonic()))
+        rng = random.Random(index)
+        ctx = VirtualUserContext(
+            client, self.make_payloads(self.config, stream=f"load{index}"), rng
+        )
+        names = list(self.weights)
+        weights = [self.weights[name] for name in names]
+        while time.monotonic() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            ctx.state.clear()
+            error = None
+            for step in SCENARIOS[scenario][1]:
+                try:
+                    step(ctx)
+                except Exception as exc:
+                    # rewritten assertion messages go on to explain the values
+                    message = str(exc).partition("\n")[0]
+                    error = f"{scenario}/{step.__name__}: {type(exc).__name__}"
+                    if message:
+                        error = f"{error}: {message}"
+                    break
+            self.results.record(scenario, error)
+
+    def pytest_runtestloop(self, session):
+        with self.open_api_target(self.config) as (base_url, token):
+            client = self.build_client(self.config, base_url, token)
+            paced = PacedClient(client, RatePacer(self.rps))
+            started = time.monotonic()
+            deadline = started + self.duration
+            threads = [
+                threading.Thread(
+                    target=self.virtual_user,
+                    args=(index, paced, started, deadline),
+                    name=f"load-vu-{index}",
+                )
+                for index in range(self.concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.monotonic() - started
+            # counted before the cleanup requests go out
+            self.requests = sum(
+                stats.total.count for stats in self.config.latency.endpoints.values()
+            )
+            self.clean_up_resources(self.config, client)
+
+        if self.error_rate() > self.max_error_rate:
+            session.testsfailed = 1
+        return True
+
+    def error_rate(self):
+        iterations = sum(self.results.iterations.values())
+        return sum(self.results.failures.values()) / iterations if iterations else 0.0
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.elapsed is None:
+            return
+        results = self.results
+        requests = self.requests
+        iterations = sum(results.iterations.values())
+        terminalreporter.write_sep("-", "load run")
+        terminalreporter.write_line(
+            f"{self.concurrency} virtual users for {self.elapsed:.1f}s"
+            f" (ramp-up {self.ramp_up:g}s, target"
+            f" {f'{self.rps:g} rps' if self.rps else 'unpaced'})"
+        )
+        terminalreporter.write_line(
+            f"throughput: {requests / self.elapsed:.1f} requests/s,"
+            f" {iterations / self.elapsed:.1f} scenarios/s"
+        )
+        terminalreporter.write_line(f"scenario error rate: {self.error_rate():.2%}")
+        for scenario, count in sorted(results.iterations.items()):
+            failed = results.failures[scenario]
+            terminalreporter.write_line(
+                f"  {scenario}: {count} runs, {failed} failed ({failed / count:.2%})"
+            )
+        for error, count in results.errors.most_common(10):
+            terminalreporter.write_line(f"  {count}x {error}")
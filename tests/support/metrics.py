@@ -0,0 +1,317 @@
+"""Per-endpoint request latency histograms for ``rest_client``."""
+
+import html
+import json
+import math
+import re
+import threading
+import time
+
+ID_SEGMENT = re.compile(r"/-?\d+(?=/|$)")
+PERCENTILES = (50, 95, 99)
+HISTOGRAMS = ("total", "ttfb", "connect")
+
+# connection setup time of the current request, set by the transport
+connect_timings = threading.local()
+
+
+def route_template(endpoint):
+    """``/users/123/todos`` -> ``/users/{id}/todos``."""
+    return ID_SEGMENT.sub("/{id}", endpoint.split("?", 1)[0])
+
+
+def _content_length(response):
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _wire_size(response, size):
+    """Bytes the body took on the wire, before it was decompressed."""
+    tell = getattr(response.raw, "tell", None)
+    if tell is not None:
+        return tell()
+    # replayed or HTTP/2 responses, which only have the headers to go by
+    if response.headers.get("Content-Encoding"):
+        return _content_length(response)
+    return size
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram with about 1% relative error.
+
+    Recording is a dict increment, so it is cheap enough to run on every
+    request; percentiles are computed from the buckets on demand.
+    """
+
+    precision = 0.01
+    floor = 1e-6
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.max = 0.0
+        self.total = 0.0
+        self._log_base = math.log1p(self.precision)
+
+    def record(self, seconds):
+        value = max(seconds, self.floor)
+        bucket = int(math.log(value / self.floor) / self._log_base)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # upper bound of the bucket, never above the exact max
+                upper = self.floor * math.exp((bucket + 1) * self._log_base)
+                return min(upper, self.max)
+        return self.max
+
+    def to_json(self):
+        return {
+            "buckets": {str(b): n for b, n in sorted(self.buckets.items())},
+            "count": self.count,
+            "max": self.max,
+            "total": self.total,
+        }
+
+    def merge_json(self, data):
+        for bucket, n in data["buckets"].items():
+            self.buckets[int(bucket)] = self.buckets.get(int(bucket), 0) + n
+        self.count += data["count"]
+        self.total += data["total"]
+        self.max = max(self.max, data["max"])
+
+    def summary(self):
+        return {
+            "count": self.count,
+            **{f"p{p}": self.percentile(p) for p in PERCENTILES},
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.connect = LatencyHistogram()
+        self.statuses = {}
+        self.bytes = 0
+        self.wire_bytes = 0
+
+    def to_json(self):
+        return {
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "bytes": self.bytes,
+            "wire_bytes": self.wire_bytes,
+            **{name: getattr(self, name).to_json() for name in HISTOGRAMS},
+        }
+
+    def merge_json(self, data):
+        for status, n in data["statuses"].items():
+            self.statuses[int(status)] = self.statuses.get(int(status), 0) + n
+        self.bytes += data["bytes"]
+        self.wire_bytes += data["wire_bytes"]
+        for name in HISTOGRAMS:
+            getattr(self, name).merge_json(data[name])
+
+    def summary(self):
+        return {
+            "requests": self.total.count,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "bytes": self.bytes,
+            "wire_bytes": self.wire_bytes,
+            "total": self.total.summary(),
+            "ttfb": self.ttfb.summary(),
+            "connect": self.connect.summary(),
+        }
+
+
+class MetricsRecorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def _stats(self, method, endpoint):
+        key = (method, route_template(endpoint))
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    def record(
+        self, method, endpoint, status, size, connect, ttfb, total, wire_size=None
+    ):
+        """Record one request; ``size`` is the decompressed body size."""
+        with self.lock:
+            stats = self._stats(method, endpoint)
+            stats.total.record(total)
+            stats.ttfb.record(ttfb)
+            if connect is not None:
+                stats.connect.record(connect)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes += size
+            stats.wire_bytes += size if wire_size is None else wire_size
+
+    def add_bytes(self, method, endpoint, size, wire_size):
+        with self.lock:
+            stats = self._stats(method, endpoint)
+            stats.bytes += size
+            stats.wire_bytes += wire_size
+
+    def _count_stream(self, method, endpoint, response):
+        raw = response.raw
+        stream = raw.stream
+
+        def counted(*args, **kwargs):
+            size = 0
+            for chunk in stream(*args, **kwargs):
+                size += len(chunk)
+                yield chunk
+            self.add_bytes(method, endpoint, size, _wire_size(response, size))
+
+        raw.stream = counted
+
+    def timed(self, method, endpoint, send_request, stream=False):
+        """Wrap ``send_request`` so each call is recorded.
+
+        Streamed responses are not read here; their bytes are added once
+        the body has been iterated to the end.
+        """
+
+        def timed_():
+            connect_timings.connect = None
+            started = time.perf_counter()
+            response = send_request()
+            total = time.perf_counter() - started
+            if stream and not response._content_consumed:
+                self._count_stream(method, endpoint, response)
+                size = wire_size = 0
+            else:
+                size = len(response.content)
+                wire_size = _wire_size(response, size)
+            self.record(
+                method,
+                endpoint,
+                response.status_code,
+                size,
+                connect_timings.connect,
+                response.elapsed.total_seconds(),
+                total,
+                wire_size,
+            )
+            return response
+
+        return timed_
+
+    def summary(self):
+        with self.lock:
+            return {
+                f"{method} {route}": stats.summary()
+                for (method, route), stats in sorted(self.endpoints.items())
+            }
+
+    def write_json(self, path):
+        """Write the summary, and the raw histograms for :meth:`merge_json`."""
+        with self.lock:
+            histograms = {
+                f"{method} {route}": stats.to_json()
+                for (method, route), stats in sorted(self.endpoints.items())
+            }
+        with open(path, "w") as f:
+            json.dump(
+                {"endpoints": self.summary(), "histograms": histograms}, f, indent=2
+            )
+
+    def merge_json(self, path):
+        """Add the requests of a file written by :meth:`write_json`."""
+        with open(path) as f:
+            histograms = json.load(f).get("histograms", {})
+        with self.lock:
+            for name, data in histograms.items():
+                method, route = name.split(" ", 1)
+                self._stats(method, route).merge_json(data)
+
+    def rows(self):
+        for name, stats in self.summary().items():
+            total = stats["total"]
+            yield (
+                name,
+                stats["requests"],
+                *(f"{total[f'p{p}'] * 1000:.1f}" for p in PERCENTILES),
+                f"{total['max'] * 1000:.1f}",
+                f"{stats['ttfb']['p50'] * 1000:.1f}",
+                stats["connect"]["count"],
+                stats["bytes"],
+                stats["wire_bytes"],
+            )
+
+    columns = (
+        "endpoint",
+        "requests",
+        *(f"p{p} ms" for p in PERCENTILES),
+        "max ms",
+        "ttfb p50 ms",
+        "connects",
+        "bytes",
+        "wire bytes",
+    )
+
+    def html_table(self):
+        head = "".join(f"<th>{html.escape(c)}</th>" for c in self.columns)
+        body = "".join(
+            "<tr>" + "".join(f"<td>{html.escape(str(v))}</td>" for v in row) + "</tr>"
+            for row in self.rows()
+        )
+        return (
+            "<h2>API latency</h2>"
+            f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+        )
+
+
+class LatencyReport:
+    """pytest plugin printing and exporting a :class:`MetricsRecorder`."""
+
+    def __init__(self, recorder, json_path=None):
+        self.recorder = recorder
+        self.json_path = json_path
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.recorder.endpoints:
+            return
+        terminalreporter.write_sep("-", "API latency")
+        rows = [self.recorder.columns, *self.recorder.rows()]
+        widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+        for row in rows:
+            terminalreporter.write_line(
+                "  ".join(
+                    str(v).ljust(w) if i == 0 else str(v).rjust(w)
+                    for i, (v, w) in enumerate(zip(row, widths))
+                )
+            )
+
+    def pytest_unconfigure(self, config):
+        if self.json_path and self.recorder.endpoints:
+            self.recorder.write_json(self.json_path)
+
+
+class LatencyHtmlReport:
+    """pytest-html section for a :class:`MetricsRecorder`."""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def pytest_html_results_summary(self, prefix, summary, postfix):
+        if self.recorder.endpoints:
+            prefix.append(self.recorder.html_table())
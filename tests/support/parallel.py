@@ -0,0 +1,219 @@
+"""Built-in parallel mode: fan the collected tests out to worker processes.
+
+``pytest --workers N`` re-invokes pytest N times with ``--shard I/N``. Every
+worker collects the same items, keeps the round-robin slice that belongs to
+it and runs it with its own fixtures (and so its own ``requests.Session``).
+The workers' test reports are replayed in the main process, so its summary
+and exit status cover every test.
+"""
+
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from support.metrics import LatencyReport, MetricsRecorder
+
+# pytest exit code for "no tests collected", expected for empty shards
+EXIT_NO_TESTS = 5
+
+# report files every worker writes, made unique with a -wINDEX suffix, and
+# the config option names they are stored under
+PER_WORKER_PATH_OPTIONS = {
+    "--html": "htmlpath",
+    "--latency-json": "latency_json",
+    "--report-jsonl": "report_jsonl",
+    "--worker-reports": "worker_reports",
+}
+
+
+def parse_shard(value):
+    index, _, count = value.partition("/")
+    if not (index.isdigit() and count.isdigit()) or not 0 <= int(index) < int(count):
+        raise ValueError(f"invalid shard {value!r}, expected INDEX/COUNT")
+    return int(index), int(count)
+
+
+def worker_seed(seed, worker_index, stream=None):
+    """Derive a distinct, reproducible Faker seed for a worker.
+
+    ``stream`` names an independent sequence within the same worker.
+    """
+    if worker_index is None and stream is None:
+        return seed
+    key = f"{seed}:{worker_index}"
+    if stream is not None:
+        key = f"{key}:{stream}"
+    digest = hashlib.sha256(key.encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def select_shard(items, shard_index, shard_count):
+    selected, deselected = [], []
+    for position, item in enumerate(items):
+        if position % shard_count == shard_index:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    return selected, deselected
+
+
+def worker_path(path, shard_index):
+    root, ext = os.path.splitext(path)
+    return f"{root}-w{shard_index}{ext}"
+
+
+def _worker_args(args, shard_index, shard_count):
+    worker_args = []
+    args = iter(args)
+    for arg in args:
+        if arg == "--workers":
+            next(args, None)
+            continue
+        if arg.startswith("--workers="):
+            continue
+        option, _, value = arg.partition("=")
+        if option in PER_WORKER_PATH_OPTIONS:
+            if not value:
+                # "--option PATH" form
+                value = next(args, None)
+                if value is None:
+                    worker_args.append(arg)
+                    continue
+            arg = f"{option}={worker_path(value, shard_index)}"
+        worker_args.append(arg)
+    worker_args.append(f"--shard={shard_index}/{shard_count}")
+    return worker_args
+
+
+class WorkerReports:
+    """Worker-side plugin saving its test reports for the main process."""
+
+    def __init__(self, config, path):
+        self.config = config
+        self.file = open(path, "w")
+
+    def pytest_runtest_logreport(self, report):
+        data = self.config.hook.pytest_report_to_serializable(
+            config=self.config, report=report
+        )
+        self.file.write(json.dumps(data) + "\n")
+        self.file.flush()
+
+    def pytest_unconfigure(self, config):
+        self.file.close()
+
+
+class ParallelRunner:
+    def __init__(self, config, workers):
+        self.config = config
+        self.workers = workers
+        self.results = []
+        self.latency = None
+        self.seed = os.environ.get("FAKER_SEED") or str(random.randrange(2**32))
+
+    def pytest_report_header(self, config):
+        return (
+            f"parallel mode: {self.workers} workers, FAKER_SEED={self.seed}"
+            " (export it to replay this run)"
+        )
+
+    def pytest_runtestloop(self, session):
+        if session.config.option.collectonly or not session.items:
+            return None
+
+        args = list(self.config.invocation_params.args)
+        env = dict(os.environ, FAKER_SEED=self.seed)
+        latency_json = self.config.getoption("latency_json")
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="pytest-workers-") as tmp_dir:
+            if not latency_json:
+                # workers always write their latencies, to merge them below
+                args.append(f"--latency-json={os.path.join(tmp_dir, 'latency.json')}")
+            reports_path = os.path.join(tmp_dir, "reports.jsonl")
+            args.append(f"--worker-reports={reports_path}")
+            procs = []
+            for index in range(self.workers):
+                log_path = os.path.join(tmp_dir, f"worker-{index}.log")
+                log = open(log_path, "w+")
+                cmd = [sys.executable, "-m", "pytest"]
+                cmd += _worker_args(args, index, self.workers)
+                proc = subprocess.Popen(
+                    cmd,
+                    cwd=self.config.invocation_params.dir,
+                    env=env,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                )
+                procs.append((index, proc, log))
+
+            for index, proc, log in procs:
+                returncode = proc.wait()
+                log.seek(0)
+                self.results.append((index, returncode, log.read()))
+                log.close()
+            self.latency = self.merge_latency(
+                latency_json or os.path.join(tmp_dir, "latency.json")
+            )
+            if latency_json and self.latency.endpoints:
+                self.latency.write_json(latency_json)
+            # counted by the terminal reporter and the session like local runs
+            for report in self.worker_reports(reports_path):
+                self.config.hook.pytest_runtest_logreport(report=report)
+        self.elapsed = time.perf_counter() - started
+
+        self.failed_workers = sum(
+            1 for _, code, _ in self.results if code not in (0, EXIT_NO_TESTS)
+        )
+        # a worker can fail without a failed test, e.g. when it crashes
+        session.testsfailed = max(session.testsfailed, self.failed_workers)
+        return True
+
+    def worker_reports(self, path):
+        for index in range(self.workers):
+            shard_path = worker_path(path, index)
+            if not os.path.exists(shard_path):
+                continue
+            with open(shard_path) as f:
+                for line in f:
+                    yield self.config.hook.pytest_report_from_serializable(
+                        config=self.config, data=json.loads(line)
+                    )
+
+    def merge_latency(self, path):
+        recorder = MetricsRecorder()
+        for index in range(self.workers):
+            shard_path = worker_path(path, index)
+            if os.path.exists(shard_path):
+                recorder.merge_json(shard_path)
+        return recorder
+
+    def worker_files(self):
+        for option, name in PER_WORKER_PATH_OPTIONS.items():
+            path = self.config.getoption(name, None)
+            if path:
+                paths = [worker_path(path, i) for i in range(self.workers)]
+                yield option, [p for p in paths if os.path.exists(p)]
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        for index, returncode, output in self.results:
+            terminalreporter.write_sep(
+                "=", f"worker {index} (exit code {returncode})", bold=True
+            )
+            terminalreporter.write(output)
+        terminalreporter.write_sep(
+            "=",
+            f"{self.workers} workers finished in {self.elapsed:.2f}s,"
+            f" {self.failed_workers} failed",
+        )
+        if self.latency is not None:
+            # the table of all workers together
+            LatencyReport(self.latency).pytest_terminal_summary(terminalreporter)
+        for option, paths in self.worker_files():
+            terminalreporter.write_line(f"worker {option} files: {' '.join(paths)}")
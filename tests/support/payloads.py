@@ -0,0 +1,222 @@
+"""Request payloads generated in bulk from the response JSON schemas.
+
+A ``PayloadGenerator`` turns the properties of ``schemas/<name>.json`` into
+column builders once, then fills batches of payloads a column at a time
+from a seeded ``random.Random``. This is much cheaper than a Faker call per
+field. Names and words come from Faker's en_US word lists, read on first
+use. Emails carry a per-seed token and a counter, so no two payloads of a
+generator ever share one.
+"""
+
+import functools
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+RANDOM = "<random>"
+INVALID = "foobar"
+# server-assigned or taken from the request path
+EXCLUDED_FIELDS = ("id", "user_id")
+
+
+DATE_TIME_START = datetime(2000, 1, 1)
+# Fixed upper bound so seeded dates don't depend on the current time
+DATE_TIME_END = datetime(2030, 1, 1)
+DATE_TIME_TZ = timezone(timedelta(hours=5, minutes=30))
+
+
+@functools.lru_cache(maxsize=None)
+def word_lists():
+    # importing faker takes longer than the rest of the suite's startup,
+    # so wait until the first payload is generated
+    from faker.providers.internet.en_US import Provider as InternetProvider
+    from faker.providers.lorem.en_US import Provider as LoremProvider
+    from faker.providers.person.en_US import Provider as PersonProvider
+
+    return SimpleNamespace(
+        first_names=tuple(PersonProvider.first_names),
+        last_names=tuple(PersonProvider.last_names),
+        words=tuple(LoremProvider.word_list),
+        domains=tuple(InternetProvider.safe_domain_names),
+    )
+
+
+def _sentences(rng, n, min_words, max_words):
+    sentences = []
+    for _ in range(n):
+        words = rng.choices(word_lists().words, k=rng.randint(min_words, max_words))
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+def _paragraphs(rng, n, max_chars):
+    paragraphs = []
+    for _ in range(n):
+        text = ""
+        for sentence in _sentences(rng, 8, 4, 10):
+            candidate = f"{text} {sentence}" if text else sentence
+            if len(candidate) > max_chars:
+                break
+            text = candidate
+        paragraphs.append(text)
+    return paragraphs
+
+
+class PayloadGenerator:
+    """Valid and invalid payloads for one schema.
+
+    ``tag`` is appended to email addresses to keep them distinct across
+    generators; ``make_payloads`` passes the worker (``w1``) and stream
+    names, joined with dots, such as ``w1.load3``.
+    """
+
+    def __init__(self, schema, seed=None, batch_size=256, tag=None):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.tag = f".{tag}" if tag else ""
+        self.fields = {
+            name: spec
+            for name, spec in schema.get("properties", {}).items()
+            if name not in EXCLUDED_FIELDS
+        }
+        self.columns = {
+            name: self._column(name, spec) for name, spec in self.fields.items()
+        }
+        self.lock = threading.Lock()
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        with self.lock:
+            self.rng = random.Random(seed)
+            self.token = f"{self.rng.getrandbits(32):08x}"
+            self.counter = 0
+            self.batch = []
+
+    def _column(self, name, spec):
+        enum = spec.get("enum")
+        if enum:
+            return lambda rng, n: rng.choices(enum, k=n)
+        if spec.get("format") == "email":
+            return self._emails
+        if spec.get("format") == "date-time":
+            return self._date_times
+        types = spec.get("type")
+        types = [types] if isinstance(types, str) else types or ["string"]
+        if "integer" in types:
+            low = spec.get("minimum", 1)
+            return lambda rng, n: [rng.randint(low, low + 10**6) for _ in range(n)]
+        if name == "name":
+            return self._names
+        if name == "body":
+            return lambda rng, n: _paragraphs(rng, n, 200)
+        return lambda rng, n: _sentences(rng, n, 4, 8)
+
+    def _names(self, rng, n):
+        lists = word_lists()
+        first = rng.choices(lists.first_names, k=n)
+        last = rng.choices(lists.last_names, k=n)
+        return [f"{f} {l}" for f, l in zip(first, last)]
+
+    def _emails(self, rng, n):
+        lists = word_lists()
+        first = rng.choices(lists.first_names, k=n)
+        last = rng.choices(lists.last_names, k=n)
+        domains = rng.choices(lists.domains, k=n)
+        start = self.counter
+        self.counter += n
+        return [
+            f"{f.lower()}.{l.lower()}.{self.token}{start + i:x}{self.tag}@{d}"
+            for i, (f, l, d) in enumerate(zip(first, last, domains))
+        ]
+
+    def _date_times(self, rng, n):
+        span = (DATE_TIME_END - DATE_TIME_START).total_seconds()
+        return [
+            (DATE_TIME_START + timedelta(seconds=int(rng.random() * span)))
+            .replace(tzinfo=DATE_TIME_TZ)
+            .isoformat(timespec="milliseconds")
+            for _ in range(n)
+        ]
+
+    def _fill_batch(self):
+        n = self.batch_size
+        columns = [self.columns[name](self.rng, n) for name in self.fields]
+        names = list(self.fields)
+        batch = [dict(zip(names, values)) for values in zip(*columns)]
+        # popped from the end, keep generation order
+        batch.reverse()
+        self.batch = batch
+
+    def next(self):
+        """A new valid payload with every field of the schema."""
+        with self.lock:
+            if not self.batch:
+                self._fill_batch()
+            return self.batch.pop()
+
+    def fill(self, data):
+        """Copy of ``data`` with ``"<random>"`` values replaced by valid ones."""
+        valid = None
+        data = data.copy()
+        for key, value in data.items():
+            if value == RANDOM:
+                valid = valid or self.next()
+                data[key] = valid[key]
+        return data
+
+    def invalid_variants(self):
+        """Yield ``(variant_id, field, payload)`` with exactly one bad field.
+
+        Each required field is in turn left out, sent blank and, when the
+        schema constrains its values, sent as an invalid value. Nullable
+        fields are optional in requests and are skipped.
+        """
+        for field, spec in self.fields.items():
+            if "null" in spec.get("type", ()):
+                continue
+            kinds = ["missing", "blank"]
+            if "enum" in spec or "format" in spec:
+                kinds.append("invalid")
+            for kind in kinds:
+                payload = self.next()
+                if kind == "missing":
+                    del payload[field]
+                else:
+                    payload[field] = "" if kind == "blank" else INVALID
+                yield f"{field}-{kind}", field, payload
+
+
+class PayloadFactory:
+    """Session-wide ``PayloadGenerator`` per schema name.
+
+    ``payloads("user").next()`` returns a new user payload. Every generator
+    is seeded from ``seed`` and its schema name, so reseeding the factory
+    makes all of them reproducible again.
+    """
+
+    def __init__(self, load_schema, seed=None, tag=None):
+        self.load_schema = load_schema
+        self.seed = seed
+        self.tag = tag
+        self.generators = {}
+        self.lock = threading.Lock()
+
+    def _seed(self, name):
+        return None if self.seed is None else f"{self.seed}:{name}"
+
+    def __call__(self, name):
+        with self.lock:
+            generator = self.generators.get(name)
+            if generator is None:
+                generator = PayloadGenerator(
+                    self.load_schema(name), seed=self._seed(name), tag=self.tag
+                )
+                self.generators[name] = generator
+            return generator
+
+    def reseed(self, seed):
+        with self.lock:
+            self.seed = seed
+            for name, generator in self.generators.items():
+                generator.reseed(self._seed(name))
@@ -0,0 +1,135 @@
+"""Client-side pacing and retries driven by GoREST's rate-limit headers.
+
+GoREST answers every request with ``X-RateLimit-Limit``,
+``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` (seconds until the
+window resets), and with 429 once the limit is exceeded. The scheduler
+keeps a token bucket in step with those headers, shared by every thread
+of the client; parallel workers each take an equal share of the limit.
+"""
+
+import random
+import threading
+import time
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Only requests that are safe to send twice are retried after a 5xx; a 429
+# means the request was not processed, so any method may be retried.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, share=1, clock=time.monotonic):
+        self.share = max(1, share)
+        self.clock = clock
+        self.lock = threading.Lock()
+        # unlimited until the server tells us otherwise
+        self.rate = None
+        self.capacity = None
+        self.tokens = 0.0
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+        self.updated = now
+
+    def reserve(self):
+        """Take a token and return how long to wait before using it."""
+        with self.lock:
+            now = self.clock()
+            wait = max(0.0, self.blocked_until - now)
+            if self.rate is None:
+                return wait
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def update(self, headers):
+        limit = _header_int(headers, "X-RateLimit-Limit")
+        remaining = _header_int(headers, "X-RateLimit-Remaining")
+        reset = _header_int(headers, "X-RateLimit-Reset")
+        if limit is None or remaining is None or reset is None:
+            return
+        reset = max(reset, 1)
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            own_remaining = max(0, remaining) / self.share
+            if self.rate is None:
+                self.tokens = own_remaining
+            self.capacity = max(1.0, limit / self.share)
+            self.rate = self.capacity / reset
+            self.tokens = min(self.tokens, own_remaining)
+            if remaining <= 0:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    def block(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        share=1,
+        max_retries=5,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        sleep=time.sleep,
+    ):
+        self.bucket = TokenBucket(share)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.retries = 0
+
+    def backoff(self, attempt, response):
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+        retry_after = _header_int(response.headers, "Retry-After")
+        if retry_after is None and response.status_code == 429:
+            retry_after = _header_int(response.headers, "X-RateLimit-Reset")
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def should_retry(self, method, response):
+        if response.status_code == 429:
+            return True
+        return response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+
+    def send(self, method, send_request):
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                self.sleep(wait)
+            response = send_request()
+            self.bucket.update(response.headers)
+            if attempt >= self.max_retries or not self.should_retry(
+                method, response
+            ):
+                return response
+            delay = self.backoff(attempt, response)
+            if response.status_code == 429:
+                self.bucket.block(delay)
+            # release the connection of a streamed response before retrying
+            response.close()
+            self.retries += 1
+            attempt += 1
+            self.sleep(delay)
@@ -0,0 +1,319 @@
+"""Streaming JSONL test report and its paginated HTML renderer.
+
+``JsonlReport`` appends one JSON line per finished test as the run goes:
+its outcome, duration, failure text (for schema failures the
+``fail_validation`` message) and the ``rest_client`` requests it sent.
+Every line is flushed at once, so a killed job keeps the results it got
+to, and nothing is held in memory across tests.
+
+Rendering is a separate step that streams the lines back, ``page_size``
+tests per HTML page, with the per-endpoint latency table of ``--latency-json``
+files on the index page:
+
+    python tests/support/report.py report/results.jsonl --out report/html \
+        --latency-json report/latency.json
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import threading
+import time
+
+# per test, so a crawl can't make a single line huge
+MAX_REQUESTS = 50
+MAX_BODY = 1000
+PAGE_SIZE = 200
+
+
+def _excerpt(data):
+    if data is None:
+        return None
+    if isinstance(data, bytes):
+        size = len(data)
+        text = data[:MAX_BODY].decode("utf-8", "replace")
+    else:
+        text = json.dumps(data)
+        size = len(text)
+    return text[:MAX_BODY] + ("..." if size > MAX_BODY else "")
+
+
+class RequestLog:
+    """Requests sent by ``Client`` since the current test started.
+
+    Requests made from background threads, like the user pool refilling
+    itself, are attributed to whichever test is running.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []
+        self.dropped = 0
+
+    def record(self, method, endpoint, body, response, stream=False):
+        entry = {
+            "method": method,
+            "url": response.url or endpoint,
+            "status": response.status_code,
+            "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 1),
+            "request": _excerpt(body),
+            "response": None if stream else _excerpt(response.content),
+        }
+        with self.lock:
+            if len(self.entries) < MAX_REQUESTS:
+                self.entries.append(entry)
+            else:
+                self.dropped += 1
+
+    def drain(self):
+        with self.lock:
+            entries, self.entries = self.entries, []
+            dropped, self.dropped = self.dropped, 0
+        return entries, dropped
+
+
+class JsonlReport:
+    """pytest plugin writing a line per test to ``path`` as soon as it ends."""
+
+    def __init__(self, path, request_log=None):
+        self.path = path
+        self.request_log = request_log
+        self.file = None
+        self.phases = {}
+        self.counts = {}
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def pytest_sessionstart(self, session):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.write({"type": "session", "started": time.time()})
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.phases[nodeid] = []
+        if self.request_log is not None:
+            self.request_log.drain()
+
+    def pytest_runtest_logreport(self, report):
+        phases = self.phases.setdefault(report.nodeid, [])
+        phases.append(report)
+        if report.when == "teardown":
+            self.write(self._record(report.nodeid, self.phases.pop(report.nodeid)))
+
+    def _record(self, nodeid, reports):
+        outcome = "passed"
+        message = None
+        for report in reports:
+            if report.failed:
+                outcome = "error" if report.when != "call" else "failed"
+            elif report.skipped and outcome == "passed":
+                outcome = "skipped"
+            if (report.failed or report.skipped) and message is None:
+                message = report.longreprtext
+        if outcome == "passed" and any(hasattr(r, "wasxfail") for r in reports):
+            outcome = "xpassed"
+        elif outcome == "skipped" and any(hasattr(r, "wasxfail") for r in reports):
+            outcome = "xfailed"
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        requests, dropped = [], 0
+        if self.request_log is not None:
+            requests, dropped = self.request_log.drain()
+        return {
+            "type": "test",
+            "nodeid": nodeid,
+            "outcome": outcome,
+            "duration": round(sum(r.duration for r in reports), 4),
+            "message": message,
+            "requests": requests,
+            "requests_dropped": dropped,
+        }
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        if self.file is None:
+            return
+        self.write(
+            {
+                "type": "summary",
+                "finished": time.time(),
+                "exitstatus": int(exitstatus),
+                "counts": self.counts,
+            }
+        )
+        self.file.close()
+        self.file = None
+
+
+def read_records(paths):
+    """Stream the records of one or more JSONL reports, e.g. one per worker.
+
+    A line cut off by a killed job is skipped.
+    """
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+STYLE = """
+body { font-family: sans-serif; margin: 1em 2em; }
+table { border-collapse: collapse; width: 100%; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; text-align: left; }
+td { vertical-align: top; }
+pre { white-space: pre-wrap; margin: 0.3em 0; }
+.passed { color: #080; } .failed, .error { color: #b00; } .skipped { color: #888; }
+"""
+
+
+def _page_name(number):
+    return f"page-{number:04d}.html"
+
+
+def _document(title, body):
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title><style>{STYLE}</style></head>"
+        f"<body><h1>{html.escape(title)}</h1>{body}</body></html>\n"
+    )
+
+
+def _test_row(record):
+    outcome = record["outcome"]
+    cell = ""
+    if record.get("message"):
+        cell += f"<pre>{html.escape(record['message'])}</pre>"
+    requests = []
+    for entry in record.get("requests", ()):
+        lines = [
+            f"{entry['method']} {entry['url']} -> {entry['status']}"
+            f" ({entry['elapsed_ms']} ms)"
+        ]
+        for label in ("request", "response"):
+            if entry.get(label):
+                lines.append(f"{label}: {entry[label]}")
+        requests.append(f"<pre>{html.escape(chr(10).join(lines))}</pre>")
+    dropped = record.get("requests_dropped", 0)
+    if requests:
+        more = f"<p>{dropped} more not logged</p>" if dropped else ""
+        cell += (
+            f"<details><summary>{len(requests) + dropped} requests</summary>"
+            f"{''.join(requests)}{more}</details>"
+        )
+    return (
+        f"<tr id='{html.escape(record['nodeid'], quote=True)}'>"
+        f"<td class='{outcome}'>{outcome}</td>"
+        f"<td>{html.escape(record['nodeid'])}</td>"
+        f"<td>{record['duration']:.3f}</td><td>{cell}</td></tr>"
+    )
+
+
+def _write_page(out_dir, number, has_next, rows):
+    nav = "<p><a href='index.html'>index</a>"
+    if number > 1:
+        nav += f" | <a href='{_page_name(number - 1)}'>previous</a>"
+    if has_next:
+        nav += f" | <a href='{_page_name(number + 1)}'>next</a>"
+    nav += "</p>"
+    table = (
+        "<table><tr><th>outcome</th><th>test</th><th>seconds</th>"
+        f"<th>details</th></tr>{''.join(rows)}</table>"
+    )
+    with open(os.path.join(out_dir, _page_name(number)), "w", encoding="utf-8") as f:
+        f.write(_document(f"Test results, page {number}", nav + table + nav))
+
+
+def latency_table(paths):
+    """The API latency table of ``--latency-json`` files, merged."""
+    from support.metrics import MetricsRecorder
+
+    recorder = MetricsRecorder()
+    for path in paths:
+        if os.path.exists(path):
+            recorder.merge_json(path)
+    return recorder.html_table() if recorder.endpoints else ""
+
+
+def render(paths, out_dir, page_size=PAGE_SIZE, latency_paths=()):
+    """Render JSONL reports into ``out_dir``; return the number of pages.
+
+    Only one page of tests is held in memory at a time. Missing
+    ``latency_paths``, as left by a job that died early, are skipped.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    failures = []
+    rows = []
+    pages = 0
+    unfinished = len(paths)
+    for record in read_records(paths):
+        if record.get("type") == "summary":
+            unfinished -= 1
+        if record.get("type") != "test":
+            continue
+        if len(rows) == page_size:
+            pages += 1
+            _write_page(out_dir, pages, True, rows)
+            rows = []
+        rows.append(_test_row(record))
+        outcome = record["outcome"]
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if outcome in ("failed", "error"):
+            failures.append((record["nodeid"], pages + 1))
+    if rows or not pages:
+        pages += 1
+        _write_page(out_dir, pages, False, rows)
+
+    summary = "".join(
+        f"<tr><td class='{o}'>{o}</td><td>{n}</td></tr>"
+        for o, n in sorted(counts.items())
+    )
+    body = f"<table><tr><th>outcome</th><th>tests</th></tr>{summary}</table>"
+    if unfinished:
+        body += "<p><b>The run did not finish, these are partial results.</b></p>"
+    body += latency_table(latency_paths)
+    body += "<h2>Pages</h2><p>" + " ".join(
+        f"<a href='{_page_name(n)}'>{n}</a>" for n in range(1, pages + 1)
+    )
+    body += "</p>"
+    if failures:
+        body += "<h2>Failures</h2><ul>" + "".join(
+            f"<li><a href='{_page_name(page)}#{html.escape(nodeid, quote=True)}'>"
+            f"{html.escape(nodeid)}</a></li>"
+            for nodeid, page in failures
+        )
+        body += "</ul>"
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_document("Test results", body))
+    return pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render JSONL test reports as HTML.")
+    parser.add_argument(
+        "reports", nargs="+", help="JSONL reports, e.g. one per worker"
+    )
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument(
+        "--latency-json",
+        action="append",
+        default=[],
+        help="latency summary written by pytest --latency-json, may be repeated",
+    )
+    args = parser.parse_args(argv)
+    pages = render(args.reports, args.out, args.page_size, args.latency_json)
+    print(f"wrote {pages} pages to {args.out}")
+
+
+if __name__ == "__main__":
+    # run as a script, the directory holding ``support`` isn't on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    main()
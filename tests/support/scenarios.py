@@ -0,0 +1,86 @@
+"""The requests and checks of the user journeys, shared by tests and load.
+
+Each step sends one request through ``client`` and asserts on the response
+like the tests always have; the tests call them and add their schema
+validation, ``pytest --load`` chains them into scenarios and counts an
+``AssertionError`` as a failed one. conftest registers this module for
+assertion rewriting, so failures explain themselves in both.
+"""
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def is_json(response):
+    return response.headers.get("Content-Type") == CONTENT_TYPE
+
+
+def json_body(response, status):
+    assert response.status_code == status
+    assert is_json(response)
+    return response.json()
+
+
+def assert_new_id(result):
+    assert "id" in result
+    assert isinstance(result["id"], int)
+    assert result["id"] > 0
+
+
+def create_user(client, data):
+    result = json_body(client.post("/users", data=data), 201)
+    assert result["name"] == data["name"]
+    assert result["email"] == data["email"]
+    assert result["gender"] == data["gender"]
+    assert result["status"] == data["status"]
+    assert_new_id(result)
+    return result
+
+
+def create_user_post(client, user_id, data):
+    result = json_body(client.post(f"/users/{user_id}/posts", data=data), 201)
+    assert result["user_id"] == user_id
+    assert result["title"] == data["title"]
+    assert result["body"] == data["body"]
+    assert_new_id(result)
+    return result
+
+
+def create_user_todo(client, user_id, data):
+    result = json_body(client.post(f"/users/{user_id}/todos", data=data), 201)
+    assert result["user_id"] == user_id
+    assert result["title"] == data.get("title")
+    assert result["due_on"] == data.get("due_on")
+    assert result["status"] == data.get("status")
+    assert_new_id(result)
+    return result
+
+
+def update_user(client, user_id, data):
+    result = json_body(client.put(f"/users/{user_id}", data=data), 200)
+    assert result["id"] == user_id
+    for field in ("name", "email", "gender", "status"):
+        if field in data:
+            assert result[field] == data[field]
+    return result
+
+
+def delete_user(client, user_id):
+    response = client.delete(f"/users/{user_id}")
+    assert response.status_code == 204
+    assert "Content-Type" not in response.headers
+    assert response.text == ""
+
+
+def get_page(client, collection, page, per_page):
+    response = client.get(f"/{collection}", params={"page": page, "per_page": per_page})
+    result = json_body(response, 200)
+    assert response.headers.get("X-Pagination-Page") == str(page)
+    assert response.headers.get("X-Pagination-Limit") == str(per_page)
+    return result
+
+
+def validation_errors(response):
+    """The error list of a 422 response."""
+    result = json_body(response, 422)
+    assert isinstance(result, list)
+    return result
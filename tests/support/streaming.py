@@ -0,0 +1,223 @@
+"""Incremental decoding and validation of JSON array responses."""
+
+import codecs
+import hashlib
+import json
+import re
+
+from support.diagnostics import ValidationFailure, collect_errors
+
+WHITESPACE = " \t\n\r"
+NUMBER_END = WHITESPACE + ",]"
+
+_decoder = json.JSONDecoder()
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'["\\]')
+
+
+class StreamDecodeError(ValueError):
+    pass
+
+
+class _ItemScanner:
+    """Find the end of a JSON object, array or string fed in pieces.
+
+    Only brackets and quotes are looked at, and each piece only once, so a
+    large item is decoded a single time, once all of it has arrived.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text, position=0):
+        """Offset in ``text`` just past the end of the item, or ``None``."""
+        while position < len(text):
+            if self.escaped:
+                self.escaped = False
+                position += 1
+            elif self.in_string:
+                match = _STRING_END.search(text, position)
+                if match is None:
+                    return None
+                position = match.end()
+                if match.group() == "\\":
+                    self.escaped = True
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return position
+            else:
+                match = _STRUCTURE.search(text, position)
+                if match is None:
+                    return None
+                position = match.end()
+                char = match.group()
+                if char == '"':
+                    self.in_string = True
+                elif char in "[{":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return position
+        return None
+
+
+def iter_json_array(chunks):
+    """Yield the items of a top-level JSON array from an iterable of bytes.
+
+    Only the item being decoded is kept in memory, so memory use does not
+    grow with the length of the array.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    eof = False
+
+    def read():
+        nonlocal eof
+        for chunk in chunks:
+            text = utf8.decode(chunk)
+            if text:
+                return text
+        if not eof:
+            eof = True
+            return utf8.decode(b"", final=True)
+        return ""
+
+    def more():
+        nonlocal buffer, position
+        text = read()
+        if not text:
+            return False
+        buffer = buffer[position:] + text
+        position = 0
+        return True
+
+    def read_container():
+        # joins the pieces of a large item once instead of after each chunk
+        nonlocal buffer, position
+        scanner = _ItemScanner()
+        end = scanner.feed(buffer, position)
+        if end is not None:
+            return
+        pieces = [buffer[position:]]
+        while end is None:
+            text = read()
+            if not text:
+                raise StreamDecodeError("truncated JSON array item")
+            pieces.append(text)
+            end = scanner.feed(text)
+        buffer = "".join(pieces)
+        position = 0
+
+    def read_scalar():
+        # numbers and literals are short, retrying them costs little
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if more():
+                    continue
+                raise StreamDecodeError("truncated JSON array item") from None
+            # a number cut at a chunk boundary decodes as a shorter number
+            if (
+                end == len(buffer) or buffer[end] not in NUMBER_END
+            ) and isinstance(item, (int, float)) and not isinstance(item, bool):
+                if more():
+                    continue
+            return item, end
+
+    def skip(separators):
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position < len(buffer) or not more():
+                return
+
+    def peek():
+        skip(WHITESPACE)
+        return buffer[position] if position < len(buffer) else ""
+
+    def finish():
+        # reads the body to its end, so the connection can be reused and
+        # the client can cache it
+        nonlocal position
+        position += 1
+        if peek():
+            raise StreamDecodeError("unexpected data after the JSON array")
+
+    if peek() != "[":
+        raise StreamDecodeError("response body is not a JSON array")
+    position += 1
+    if peek() == "]":
+        finish()
+        return
+
+    while True:
+        first = peek()
+        if not first:
+            raise StreamDecodeError("unterminated JSON array")
+        if first in '{["':
+            read_container()
+            try:
+                item, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                raise StreamDecodeError("invalid JSON array item") from None
+        else:
+            item, end = read_scalar()
+        position = end
+        yield item
+        separator = peek()
+        if separator == "]":
+            finish()
+            return
+        if separator != ",":
+            raise StreamDecodeError(f"expected ',' or ']', got {separator!r}")
+        position += 1
+
+
+def item_digest(item):
+    raw = json.dumps(item, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode(), digest_size=16).digest()
+
+
+def validate_array_stream(items, compiled):
+    """Validate a stream of items against a compiled array schema.
+
+    ``compiled`` is a ``CompiledSchema`` for an array schema. Its ``items``
+    subschema is checked on each item as it arrives and ``minItems``,
+    ``maxItems`` and ``uniqueItems`` are checked from a running count and
+    item digests, so the array is never held in memory. Returns ``None``
+    if the stream is valid, else a ``ValidationFailure`` for the first
+    offending item.
+    """
+    schema = compiled.schema
+    item_validator = compiled.subschema("items") if "items" in schema else None
+    unique = schema.get("uniqueItems", False)
+    max_items = schema.get("maxItems")
+    digests = set()
+    count = 0
+    for index, item in enumerate(items):
+        count = index + 1
+        if item_validator is not None and not item_validator.is_valid(item):
+            errors, more = collect_errors(item_validator, item)
+            return ValidationFailure(item, errors, root=[index], more=more)
+        if unique:
+            digest = item_digest(item)
+            if digest in digests:
+                message = "is a duplicate of a previous item"
+                return ValidationFailure(item, [([], message)], root=[index])
+            digests.add(digest)
+        if max_items is not None and count > max_items:
+            message = f"is item {count}, the array has more than {max_items}"
+            return ValidationFailure(item, [([], message)], root=[index])
+    min_items = schema.get("minItems")
+    if min_items is not None and count < min_items:
+        message = f"has {count} items, expected at least {min_items}"
+        return ValidationFailure([], [([], message)])
+    return None
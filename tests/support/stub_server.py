@@ -0,0 +1,459 @@
+"""Offline stand-in for the GoREST public API.
+
+Serves ``/users``, ``/posts``, ``/todos``, ``/users/{id}/posts`` and
+``/users/{id}/todos`` from memory over loopback HTTP, mimicking the status
+codes, validation messages and headers that the test suite asserts.
+"""
+
+import gzip
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+SEED_SIZE = 60
+RATE_LIMIT = 10000
+RATE_LIMIT_WINDOW = 60
+# like nginx's gzip_min_length, tiny bodies aren't worth compressing
+MIN_COMPRESS_SIZE = 256
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+BLANK = "can't be blank"
+NOT_FOUND = {"message": "Resource not found"}
+
+
+class RateLimitWindow:
+    """Fixed-window request limit reported with GoREST's headers."""
+
+    def __init__(self, limit=RATE_LIMIT, window=RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self.lock = threading.Lock()
+        self.window_end = 0.0
+        self.used = 0
+
+    def hit(self):
+        """Count a request, returning ``(allowed, headers)``."""
+        with self.lock:
+            now = time.monotonic()
+            if now >= self.window_end:
+                self.window_end = now + self.window
+                self.used = 0
+            allowed = self.used < self.limit
+            if allowed:
+                self.used += 1
+            reset = max(1, math.ceil(self.window_end - now))
+            return allowed, {
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Remaining": str(self.limit - self.used),
+                "X-RateLimit-Reset": str(reset),
+            }
+
+
+class Store:
+    def __init__(self, seed_size=SEED_SIZE):
+        self.lock = threading.Lock()
+        self.users = {}
+        self.posts = {}
+        self.todos = {}
+        self._next_id = 1
+        self._seed(seed_size)
+
+    def next_id(self):
+        id_ = self._next_id
+        self._next_id += 1
+        return id_
+
+    def _seed(self, size):
+        for i in range(size):
+            user_id = self.next_id()
+            self.users[user_id] = {
+                "id": user_id,
+                "name": f"Seed User {i}",
+                "email": f"seed.user.{i}@example.com",
+                "gender": ("male", "female")[i % 2],
+                "status": ("active", "inactive")[i % 2],
+            }
+            post_id = self.next_id()
+            self.posts[post_id] = {
+                "id": post_id,
+                "user_id": user_id,
+                "title": f"Seed post {i}",
+                "body": f"Body of seed post {i}.",
+            }
+            todo_id = self.next_id()
+            self.todos[todo_id] = {
+                "id": todo_id,
+                "user_id": user_id,
+                "title": f"Seed todo {i}",
+                "due_on": None if i % 3 else "2030-01-01T00:00:00.000+05:30",
+                "status": ("pending", "completed")[i % 2],
+            }
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def validate_user(data, store, user_id=None, partial=False):
+    errors = []
+
+    def present(field):
+        return not partial or field in data
+
+    if present("name") and _is_blank(data.get("name")):
+        errors.append({"field": "name", "message": BLANK})
+    if present("email"):
+        email = data.get("email")
+        if _is_blank(email):
+            errors.append({"field": "email", "message": BLANK})
+        elif not isinstance(email, str) or not EMAIL_RE.match(email):
+            errors.append({"field": "email", "message": "is invalid"})
+        elif any(
+            u["email"] == email and u["id"] != user_id for u in store.users.values()
+        ):
+            errors.append({"field": "email", "message": "has already been taken"})
+    if present("gender") and data.get("gender") not in ("male", "female"):
+        errors.append(
+            {"field": "gender", "message": "can't be blank, can be male of female"}
+        )
+    if present("status") and data.get("status") not in ("active", "inactive"):
+        errors.append({"field": "status", "message": BLANK})
+    return errors
+
+
+def validate_post(data, store, user_id):
+    errors = []
+    if user_id not in store.users:
+        errors.append({"field": "user", "message": "must exist"})
+    if _is_blank(data.get("title")):
+        errors.append({"field": "title", "message": BLANK})
+    if _is_blank(data.get("body")):
+        errors.append({"field": "body", "message": BLANK})
+    return errors
+
+
+def validate_todo(data, store, user_id):
+    errors = []
+    if user_id not in store.users:
+        errors.append({"field": "user", "message": "must exist"})
+    if _is_blank(data.get("title")):
+        errors.append({"field": "title", "message": BLANK})
+    if data.get("status") not in ("pending", "completed"):
+        errors.append(
+            {
+                "field": "status",
+                "message": "can't be blank, can be pending or completed",
+            }
+        )
+    due_on = data.get("due_on")
+    if due_on is not None:
+        try:
+            datetime.fromisoformat(due_on)
+        except (TypeError, ValueError):
+            errors.append({"field": "due_on", "message": "is invalid"})
+    return errors
+
+
+def _etag(raw, headers):
+    digest = hashlib.blake2b(raw, digest_size=12)
+    # pagination totals can change while a page's records stay the same
+    for name in sorted(headers):
+        if name.startswith("X-Pagination-"):
+            digest.update(f"{name}:{headers[name]}".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _etags(header):
+    if not header:
+        return ()
+    return [tag.strip() for tag in header.split(",")]
+
+
+def _compress(raw, accept_encoding):
+    """``(body, content_encoding)`` for a client's ``Accept-Encoding``."""
+    if len(raw) < MIN_COMPRESS_SIZE or not accept_encoding:
+        return raw, None
+    accepted = {part.split(";")[0].strip() for part in accept_encoding.split(",")}
+    if "br" in accepted and brotli is not None:
+        return brotli.compress(raw, quality=4), "br"
+    if "gzip" in accepted:
+        return gzip.compress(raw, compresslevel=6, mtime=0), "gzip"
+    return raw, None
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "GoRESTStub/1.0"
+    disable_nagle_algorithm = True
+
+    routes = (
+        ("GET", re.compile(r"^/(users|posts|todos)$"), "list_collection"),
+        ("GET", re.compile(r"^/users/(-?\d+)/(posts|todos)$"), "list_nested"),
+        ("GET", re.compile(r"^/(users|posts|todos)/(-?\d+)$"), "get_item"),
+        ("POST", re.compile(r"^/users$"), "create_user"),
+        ("POST", re.compile(r"^/users/(-?\d+)/(posts|todos)$"), "create_nested"),
+        ("POST", re.compile(r"^/(posts|todos)$"), "create_top_level"),
+        ("PUT", re.compile(r"^/users/(-?\d+)$"), "update_user"),
+        ("PATCH", re.compile(r"^/users/(-?\d+)$"), "update_user"),
+        ("DELETE", re.compile(r"^/(users|posts|todos)/(-?\d+)$"), "delete_item"),
+    )
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        prefix = self.server.path_prefix
+        if prefix and path.startswith(prefix):
+            path = path[len(prefix) :] or "/"
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        body = self.read_body()
+
+        allowed, self.rate_limit_headers = self.server.rate_limit.hit()
+        if not allowed:
+            self.send_json(429, {"message": "Too many requests"})
+            return
+        if method != "GET" and not self.authorized():
+            self.send_json(401, {"message": "Authentication failed"})
+            return
+
+        for route_method, pattern, handler_name in self.routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                with self.store.lock:
+                    status, payload, headers = getattr(self, handler_name)(
+                        body, *match.groups()
+                    )
+                self.send_json(status, payload, headers)
+                return
+        self.send_json(404, NOT_FOUND)
+
+    def authorized(self):
+        auth = self.headers.get("Authorization", "")
+        scheme, _, token = auth.partition(" ")
+        return scheme == "Bearer" and token not in ("", "None")
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def send_json(self, status, payload, headers=None):
+        headers = {**self.rate_limit_headers, **(headers or {})}
+        raw = b"" if status == 204 else json.dumps(payload).encode()
+        if self.command == "GET" and status == 200:
+            headers["ETag"] = _etag(raw, headers)
+            if headers["ETag"] in _etags(self.headers.get("If-None-Match")):
+                status = 304
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status in (204, 304):
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, encoding = _compress(raw, self.headers.get("Accept-Encoding"))
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def paginate(self, items):
+        page = _as_int(self.query.get("page"))
+        page = page if page and page > 0 else 1
+        per_page = _as_int(self.query.get("per_page"))
+        if not per_page or per_page <= 0:
+            per_page = DEFAULT_PER_PAGE
+        per_page = min(per_page, MAX_PER_PAGE)
+        # GoREST lists newest first
+        items = sorted(items, key=lambda item: item["id"], reverse=True)
+        total = len(items)
+        pages = -(-total // per_page)
+        start = (page - 1) * per_page
+        headers = {
+            "X-Pagination-Total": str(total),
+            "X-Pagination-Pages": str(pages),
+            "X-Pagination-Page": str(page),
+            "X-Pagination-Limit": str(per_page),
+        }
+        return [dict(item) for item in items[start : start + per_page]], headers
+
+    def list_collection(self, body, collection):
+        items, headers = self.paginate(getattr(self.store, collection).values())
+        return 200, items, headers
+
+    def list_nested(self, body, user_id, collection):
+        user_id = int(user_id)
+        items = [
+            item
+            for item in getattr(self.store, collection).values()
+            if item["user_id"] == user_id
+        ]
+        items, headers = self.paginate(items)
+        return 200, items, headers
+
+    def get_item(self, body, collection, item_id):
+        item = getattr(self.store, collection).get(int(item_id))
+        if item is None:
+            return 404, NOT_FOUND, None
+        return 200, dict(item), None
+
+    def create_user(self, body):
+        errors = validate_user(body, self.store)
+        if errors:
+            return 422, errors, None
+        user = {
+            "id": self.store.next_id(),
+            "name": body["name"],
+            "email": body["email"],
+            "gender": body["gender"],
+            "status": body["status"],
+        }
+        self.store.users[user["id"]] = user
+        return 201, dict(user), None
+
+    def create_nested(self, body, user_id, collection):
+        return self._create_child(body, int(user_id), collection)
+
+    def create_top_level(self, body, collection):
+        return self._create_child(body, _as_int(body.get("user_id")), collection)
+
+    def _create_child(self, body, user_id, collection):
+        if collection == "posts":
+            errors = validate_post(body, self.store, user_id)
+        else:
+            errors = validate_todo(body, self.store, user_id)
+        if errors:
+            return 422, errors, None
+        item = {"id": self.store.next_id(), "user_id": user_id, "title": body["title"]}
+        if collection == "posts":
+            item["body"] = body["body"]
+        else:
+            item["due_on"] = body.get("due_on")
+            item["status"] = body["status"]
+        getattr(self.store, collection)[item["id"]] = item
+        return 201, dict(item), None
+
+    def update_user(self, body, user_id):
+        user = self.store.users.get(int(user_id))
+        if user is None:
+            return 404, NOT_FOUND, None
+        errors = validate_user(body, self.store, user_id=user["id"], partial=True)
+        if errors:
+            return 422, errors, None
+        for field in ("name", "email", "gender", "status"):
+            if field in body:
+                user[field] = body[field]
+        return 200, dict(user), None
+
+    def delete_item(self, body, collection, item_id):
+        item_id = int(item_id)
+        items = getattr(self.store, collection)
+        if item_id not in items:
+            return 404, NOT_FOUND, None
+        del items[item_id]
+        if collection == "users":
+            for children in (self.store.posts, self.store.todos):
+                for child_id in [
+                    k for k, v in children.items() if v["user_id"] == item_id
+                ]:
+                    del children[child_id]
+        return 204, None, None
+
+
+class StubServer:
+    """Run the stand-in API on a loopback port in a daemon thread."""
+
+    path_prefix = "/public/v2"
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        seed_size=SEED_SIZE,
+        rate_limit=RATE_LIMIT,
+        rate_limit_window=RATE_LIMIT_WINDOW,
+    ):
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = Store(seed_size)
+        self.httpd.rate_limit = RateLimitWindow(rate_limit, rate_limit_window)
+        self.httpd.path_prefix = self.path_prefix
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.path_prefix}"
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, name="gorest-stub", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
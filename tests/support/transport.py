@@ -0,0 +1,156 @@
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from support.metrics import connect_timings
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "gorest-api-tests",
+}
+
+
+def accept_encoding(compression=True):
+    """``Accept-Encoding`` for the decoders installed here.
+
+    urllib3 and httpx decode gzip and, with the brotli package, br while
+    the body is streamed, so ``iter_content`` yields decompressed chunks.
+    """
+    if not compression:
+        return "identity"
+    encodings = ["gzip"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.insert(0, "br")
+    return ", ".join(encodings)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        # DNS resolution, TCP handshake and, for HTTPS, the TLS handshake
+        connect_timings.connect = time.perf_counter() - started
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        connect_timings.connect = time.perf_counter() - started
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections report their setup time."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def pool_size(config):
+    """Connections for the most requests ``rest_client`` sends at once.
+
+    Fan-out, crawls, cleanup and the user pool send up to --concurrency
+    requests at once, but the hedger's threads and the virtual users of a
+    load run can send more. urllib3 discards connections released into a
+    full pool, which would undo the warm-up.
+    """
+    sizes = [config.getoption("concurrency")]
+    hedger = getattr(config, "hedger", None)
+    if hedger is not None:
+        sizes.append(hedger.max_workers)
+    if config.getoption("load"):
+        sizes.append(config.getoption("load_concurrency"))
+    return max(sizes)
+
+
+class TransportConfig:
+    """Connection pool, timeout and header settings for a ``Client`` session.
+
+    The pool holds ``pool_size`` connections, by default ``concurrency``, so
+    that concurrent requests never queue for a socket and connections
+    released at once are all kept for reuse. Every request gets a connect
+    and a read timeout so a hung connection fails the test instead of the
+    whole job.
+    With ``http2`` the requests are multiplexed over one connection per
+    host instead, see ``support.http2``.
+    """
+
+    def __init__(
+        self,
+        concurrency=16,
+        connect_timeout=5.0,
+        read_timeout=30.0,
+        headers=None,
+        http2=False,
+        compression=True,
+        pool_size=None,
+    ):
+        self.concurrency = concurrency
+        self.pool_size = pool_size or concurrency
+        self.http2 = http2
+        self.timeout = (connect_timeout, read_timeout)
+        self.headers = {
+            **DEFAULT_HEADERS,
+            "Accept-Encoding": accept_encoding(compression),
+            **(headers or {}),
+        }
+
+    def adapter(self):
+        if self.http2:
+            from support.http2 import Http2Adapter
+
+            return Http2Adapter(max_connections=self.pool_size)
+        # retries are handled by the request scheduler, not urllib3
+        return TimedHTTPAdapter(
+            pool_connections=self.concurrency,
+            pool_maxsize=self.pool_size,
+            max_retries=0,
+        )
+
+    def apply(self, client):
+        adapter = self.adapter()
+        client.session.mount("http://", adapter)
+        client.session.mount("https://", adapter)
+        client.session.headers.update(self.headers)
+        client.timeout = self.timeout
+        return adapter
+
+    def warm_up(self, client, connections):
+        """Open up to ``connections`` pooled keep-alive connections at once."""
+        connections = min(connections, self.pool_size)
+        if self.http2:
+            # a burst would race several handshakes before ALPN settles on
+            # HTTP/2, and one multiplexed connection is all that is needed
+            connections = min(connections, 1)
+        if connections <= 0:
+            return 0
+        url = f"{client.base_url}/users"
+
+        def touch(_):
+            try:
+                response = client.thread_session().get(
+                    url, params={"per_page": 1}, timeout=self.timeout
+                )
+            except RequestException:
+                return False
+            return response.ok
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(touch, range(connections)))
@@ -0,0 +1,163 @@
+"""Duplicate id detection over streams of records.
+
+``DuplicateDetector`` maps integer ids to the page they were first seen on.
+Ids start out in a dict; once ``dense_ids`` of them fall into the same
+fixed-size range, that range moves to a block of 32-bit slots, so far-apart
+ids cost a dict entry and dense ones 4 bytes each. Blocks beyond
+``memory_limit`` bytes are carved out of a few large memory-mapped regions
+of a temporary file instead of allocated on the heap. Ids that are not
+integers go to a plain dict.
+"""
+
+import array
+import mmap
+import tempfile
+
+# 16384 ids x 4 bytes = 64 KiB per block
+BLOCK_SHIFT = 14
+BLOCK_IDS = 1 << BLOCK_SHIFT
+BLOCK_MASK = BLOCK_IDS - 1
+BLOCK_BYTES = BLOCK_IDS * array.array("I").itemsize
+# ids in one block before a bitmap is cheaper than their dict entries
+DENSE_IDS = BLOCK_IDS // 16
+# each region is one mapping and one file descriptor
+REGION_BLOCKS = 1024
+REGION_BYTES = REGION_BLOCKS * BLOCK_BYTES
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+class DuplicateDetector:
+    def __init__(
+        self, memory_limit=DEFAULT_MEMORY_LIMIT, spill_dir=None, dense_ids=DENSE_IDS
+    ):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.dense_ids = dense_ids
+        self.blocks = {}
+        self.sparse = {}
+        self.sparse_ids = {}
+        self.other = {}
+        self.duplicates = {}
+        self.count = 0
+        self.heap_bytes = 0
+        self.spill_file = None
+        self.spill_maps = []
+        self.spill_views = []
+        self.spilled_blocks = 0
+
+    def _new_block(self):
+        if self.heap_bytes + BLOCK_BYTES <= self.memory_limit:
+            self.heap_bytes += BLOCK_BYTES
+            return memoryview(bytearray(BLOCK_BYTES)).cast("I")
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(dir=self.spill_dir)
+        region, index = divmod(self.spilled_blocks, REGION_BLOCKS)
+        if index == 0:
+            # the file is sparse, untouched blocks cost no disk space
+            self.spill_file.truncate((region + 1) * REGION_BYTES)
+            mapped = mmap.mmap(
+                self.spill_file.fileno(), REGION_BYTES, offset=region * REGION_BYTES
+            )
+            self.spill_maps.append(mapped)
+            self.spill_views.append(memoryview(mapped).cast("I"))
+        self.spilled_blocks += 1
+        start = index * BLOCK_IDS
+        return self.spill_views[region][start : start + BLOCK_IDS]
+
+    def _densify(self, block_number):
+        """Move the sparse ids of ``block_number`` into a new block."""
+        block = self.blocks[block_number] = self._new_block()
+        for id_ in self.sparse_ids.pop(block_number):
+            block[id_ & BLOCK_MASK] = self.sparse.pop(id_) + 1
+        return block
+
+    def _duplicate(self, id_, first_page, page):
+        pages = self.duplicates.get(id_)
+        if pages is None:
+            self.duplicates[id_] = [first_page, page]
+        else:
+            pages.append(page)
+
+    def add(self, id_, page=0):
+        """Record ``id_`` as seen on ``page``; return False if it repeats."""
+        return not self.add_page(page, (id_,))
+
+    def add_page(self, page, ids):
+        """Record every id in ``ids`` as seen on ``page``.
+
+        Returns the number of repeated ids found on this page.
+        """
+        # slot values are page + 1, zero means not seen yet
+        slot_value = page + 1
+        blocks = self.blocks
+        sparse = self.sparse
+        sparse_ids = self.sparse_ids
+        found = 0
+        count = 0
+        # pages hold neighbouring ids, so the previous block usually matches
+        block_number = block = None
+        for count, id_ in enumerate(ids, 1):
+            if type(id_) is not int:
+                first_page = self.other.get(id_)
+                if first_page is None:
+                    self.other[id_] = page
+                else:
+                    found += 1
+                    self._duplicate(id_, first_page, page)
+                continue
+            if id_ >> BLOCK_SHIFT != block_number:
+                block_number = id_ >> BLOCK_SHIFT
+                block = blocks.get(block_number)
+            if block is None:
+                first_page = sparse.get(id_)
+                if first_page is not None:
+                    found += 1
+                    self._duplicate(id_, first_page, page)
+                    continue
+                sparse[id_] = page
+                in_block = sparse_ids.get(block_number)
+                if in_block is None:
+                    in_block = sparse_ids[block_number] = []
+                in_block.append(id_)
+                if len(in_block) >= self.dense_ids:
+                    block = self._densify(block_number)
+                continue
+            slot = id_ & BLOCK_MASK
+            seen = block[slot]
+            if seen:
+                found += 1
+                self._duplicate(id_, seen - 1, page)
+            else:
+                block[slot] = slot_value
+        self.count += count
+        return found
+
+    def describe(self, limit=20):
+        """Human-readable list of repeated ids and the pages they are on."""
+        lines = [
+            f"id {id_} on pages {', '.join(map(str, pages))}"
+            for id_, pages in list(self.duplicates.items())[:limit]
+        ]
+        if len(self.duplicates) > limit:
+            lines.append(f"... and {len(self.duplicates) - limit} more")
+        return "\n".join(lines)
+
+    def close(self):
+        for view in self.blocks.values():
+            view.release()
+        self.blocks.clear()
+        for view in self.spill_views:
+            view.release()
+        self.spill_views.clear()
+        for mapped in self.spill_maps:
+            mapped.close()
+        self.spill_maps.clear()
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
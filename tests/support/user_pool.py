@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class UserPoolError(Exception):
+    pass
+
+
+class UserPool:
+    """Users created ahead of time so tests don't wait on ``POST /users``.
+
+    ``start()`` creates ``size`` users concurrently and ``acquire()`` hands
+    out a ready user id. Replacements are only created in the background
+    once fewer than ``low_water`` users are ready or being created, so a
+    pool sized for the run creates few users beyond the ones handed out.
+    """
+
+    def __init__(
+        self, client, make_data, size, concurrency=8, timeout=30, low_water=None
+    ):
+        self.client = client
+        self.make_data = make_data
+        self.size = size
+        self.low_water = max(1, size // 4) if low_water is None else low_water
+        self.timeout = timeout
+        self.ready = queue.Queue()
+        self.errors = queue.Queue()
+        self.data_lock = threading.Lock()
+        self.count_lock = threading.Lock()
+        self.creating = 0
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, min(concurrency, size)),
+            thread_name_prefix="user-pool",
+        )
+        self.started = False
+        self.closed = False
+
+    def start(self):
+        if not self.started:
+            self.started = True
+            for _ in range(self.size):
+                self._refill()
+        return self
+
+    def _refill(self):
+        if self.closed:
+            return
+        with self.count_lock:
+            self.creating += 1
+        self.executor.submit(self._create)
+
+    def _refill_below(self, low_water):
+        with self.count_lock:
+            available = self.ready.qsize() + self.creating
+        if available < low_water:
+            self._refill()
+
+    def _create(self):
+        try:
+            with self.data_lock:
+                data = self.make_data()
+            response = self.client.post("/users", data=data)
+            if response.status_code == 201:
+                self.ready.put(response.json()["id"])
+            else:
+                self.errors.put(f"{response.status_code} {response.text}")
+        except Exception as exc:
+            self.errors.put(f"{type(exc).__name__}: {exc}")
+        finally:
+            # after the put, so the user is never counted as neither
+            with self.count_lock:
+                self.creating -= 1
+
+    def acquire(self):
+        self.start()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                user_id = self.ready.get(timeout=0.05)
+                break
+            except queue.Empty:
+                # with nothing on the way, don't wait for the timeout
+                self._refill_below(1)
+            try:
+                error = self.errors.get_nowait()
+            except queue.Empty:
+                if time.monotonic() > deadline:
+                    raise UserPoolError("timed out waiting for a pooled user")
+                continue
+            # replace the failed creation and report it to the caller
+            self._refill()
+            raise UserPoolError(f"could not create pooled user: {error}")
+        self._refill_below(self.low_water)
+        return user_id
+
+    def close(self):
+        self.closed = True
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,304 @@
+"""Compiled, cached JSON schema validators.
+
+``ValidatorRegistry.get(schema)`` builds a ``Draft7Validator`` once per
+schema, keyed by object identity and then by content hash, with local
+``#/definitions/...`` references inlined up front. For the simple object
+and array schemas used by this suite it also generates a plain Python
+``is_valid`` function that answers the common "valid" case without going
+through jsonschema at all; invalid instances still go through the full
+validator to get its error messages.
+"""
+
+import hashlib
+import json
+
+MISSING = object()
+
+# keywords that do not affect validation
+ANNOTATIONS = {"$schema", "$id", "title", "description", "definitions", "format"}
+
+
+def content_hash(schema):
+    raw = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def inline_refs(schema, root=None):
+    """Replace local ``#/...`` references with the schema they point to.
+
+    Recursive references are left untouched, jsonschema resolves those.
+    """
+    root = schema if root is None else root
+
+    def resolve(pointer):
+        node = root
+        for part in pointer[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            node = node[int(part)] if isinstance(node, list) else node[part]
+        return node
+
+    def walk(node, seen):
+        if isinstance(node, list):
+            return [walk(item, seen) for item in node]
+        if not isinstance(node, dict):
+            return node
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/") and ref not in seen:
+            try:
+                target = resolve(ref)
+            except (KeyError, IndexError, ValueError, TypeError):
+                return node
+            return walk(target, seen | {ref})
+        return {key: walk(value, seen) for key, value in node.items()}
+
+    inlined = walk(schema, frozenset())
+    if any(isinstance(n, dict) and "$ref" in n for n in _iter_nodes(inlined)):
+        # something could not be inlined, keep definitions reachable
+        return schema
+    return inlined
+
+
+def _iter_nodes(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def _canonical(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def _all_unique(items):
+    seen = set()
+    for item in items:
+        key = json.dumps(_canonical(item), sort_keys=True)
+        if key in seen:
+            return False
+        seen.add(key)
+    return True
+
+
+def _is_integer(value):
+    return type(value) is int or (type(value) is float and value.is_integer())
+
+
+def _is_number(value):
+    return type(value) in (int, float)
+
+
+TYPE_CHECKS = {
+    "object": "type({v}) is dict",
+    "array": "type({v}) is list",
+    "string": "type({v}) is str",
+    "integer": "_is_integer({v})",
+    "number": "_is_number({v})",
+    "boolean": "type({v}) is bool",
+    "null": "{v} is None",
+}
+
+SUPPORTED = ANNOTATIONS | {
+    "type",
+    "properties",
+    "required",
+    "additionalProperties",
+    "enum",
+    "minimum",
+    "maximum",
+    "minLength",
+    "maxLength",
+    "items",
+    "minItems",
+    "maxItems",
+    "uniqueItems",
+}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class FastPathCompiler:
+    """Generate Python source for a schema's ``is_valid`` check."""
+
+    def __init__(self):
+        self.functions = []
+        self.constants = {}
+
+    def constant(self, value):
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def compile(self, schema):
+        if not isinstance(schema, dict) or not set(schema) <= SUPPORTED:
+            raise _Unsupported(schema)
+        name = f"_f{len(self.functions)}"
+        self.functions.append(None)
+        lines = [f"def {name}(v):"]
+
+        types = schema.get("type")
+        if types is not None:
+            types = [types] if isinstance(types, str) else types
+            if not set(types) <= set(TYPE_CHECKS):
+                raise _Unsupported(schema)
+            check = " or ".join(f"({TYPE_CHECKS[t].format(v='v')})" for t in types)
+            lines.append(f"    if not ({check}): return False")
+
+        if "enum" in schema:
+            values = schema["enum"]
+            if not all(isinstance(value, str) or value is None for value in values):
+                raise _Unsupported(schema)
+            allowed = self.constant(tuple(values))
+            lines.append(f"    if v not in {allowed}: return False")
+
+        string_checks = []
+        if "minLength" in schema:
+            string_checks.append(f"len(v) < {int(schema['minLength'])}")
+        if "maxLength" in schema:
+            string_checks.append(f"len(v) > {int(schema['maxLength'])}")
+        if string_checks:
+            checks = " or ".join(string_checks)
+            lines.append(f"    if type(v) is str and ({checks}): return False")
+
+        number_checks = []
+        if "minimum" in schema:
+            number_checks.append(f"v < {self.constant(schema['minimum'])}")
+        if "maximum" in schema:
+            number_checks.append(f"v > {self.constant(schema['maximum'])}")
+        if number_checks:
+            lines.append(
+                f"    if _is_number(v) and ({' or '.join(number_checks)}): return False"
+            )
+
+        object_keywords = {"properties", "required", "additionalProperties"}
+        if object_keywords & set(schema):
+            lines.append("    if type(v) is dict:")
+            for field in schema.get("required", ()):
+                lines.append(f"        if {field!r} not in v: return False")
+            properties = schema.get("properties", {})
+            additional = schema.get("additionalProperties", True)
+            if additional is False:
+                allowed = self.constant(frozenset(properties))
+                lines.append(f"        if not {allowed}.issuperset(v): return False")
+            elif additional is not True:
+                raise _Unsupported(schema)
+            for field, subschema in properties.items():
+                func = self.compile(subschema)
+                lines.append(f"        x = v.get({field!r}, _MISSING)")
+                lines.append(
+                    f"        if x is not _MISSING and not {func}(x): return False"
+                )
+
+        array_keywords = {"items", "minItems", "maxItems", "uniqueItems"}
+        if array_keywords & set(schema):
+            lines.append("    if type(v) is list:")
+            if "minItems" in schema:
+                lines.append(
+                    f"        if len(v) < {int(schema['minItems'])}: return False"
+                )
+            if "maxItems" in schema:
+                lines.append(
+                    f"        if len(v) > {int(schema['maxItems'])}: return False"
+                )
+            if "items" in schema:
+                if not isinstance(schema["items"], dict):
+                    raise _Unsupported(schema)
+                func = self.compile(schema["items"])
+                lines.append("        for x in v:")
+                lines.append(f"            if not {func}(x): return False")
+            if schema.get("uniqueItems"):
+                lines.append("        if not _all_unique(v): return False")
+
+        lines.append("    return True")
+        self.functions[int(name[2:])] = "\n".join(lines)
+        return name
+
+    def build(self, schema):
+        entry = self.compile(schema)
+        source = "\n\n".join(self.functions)
+        namespace = {
+            "_MISSING": MISSING,
+            "_is_integer": _is_integer,
+            "_is_number": _is_number,
+            "_all_unique": _all_unique,
+            **self.constants,
+        }
+        exec(compile(source, "<jsonschema-fastpath>", "exec"), namespace)
+        is_valid = namespace[entry]
+        is_valid.source = source
+        return is_valid
+
+
+def build_fast_path(schema):
+    """Return a generated ``is_valid(instance)`` for ``schema``, or ``None``."""
+    try:
+        return FastPathCompiler().build(schema)
+    except _Unsupported:
+        return None
+
+
+class CompiledSchema:
+    def __init__(self, schema, fast_path=True):
+        # jsonschema is slow to import, load it with the first schema
+        import jsonschema
+
+        self.schema = inline_refs(schema)
+        self.validator = jsonschema.Draft7Validator(self.schema)
+        self.fast_is_valid = build_fast_path(self.schema) if fast_path else None
+        self.fast_path = fast_path
+        self.subschemas = {}
+
+    def is_valid(self, instance):
+        if self.fast_is_valid is not None and self.fast_is_valid(instance):
+            return True
+        return self.validator.is_valid(instance)
+
+    def iter_errors(self, instance):
+        return self.validator.iter_errors(instance)
+
+    def subschema(self, keyword):
+        """Compiled schema of ``self.schema[keyword]``, like ``items``."""
+        compiled = self.subschemas.get(keyword)
+        if compiled is None:
+            compiled = CompiledSchema(self.schema[keyword], fast_path=self.fast_path)
+            self.subschemas[keyword] = compiled
+        return compiled
+
+
+class ValidatorRegistry:
+    """Session-wide cache of :class:`CompiledSchema` objects.
+
+    Lookups are by ``id(schema)`` of the first object seen with a given
+    content, then by content hash, so schemas rebuilt with the same content
+    (like the list wrapper schemas) are only compiled once.
+    Schemas must not be mutated after their first use.
+    """
+
+    def __init__(self, fast_path=True):
+        self.fast_path = fast_path
+        self.by_id = {}
+        self.by_hash = {}
+
+    def get(self, schema):
+        entry = self.by_id.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+        key = content_hash(schema)
+        compiled = self.by_hash.get(key)
+        if compiled is None:
+            compiled = CompiledSchema(schema, fast_path=self.fast_path)
+            self.by_hash[key] = compiled
+            # keep the schema alive so its id cannot be reused by another object
+            self.by_id[id(schema)] = (schema, compiled)
+        return compiled
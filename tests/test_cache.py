@@ -0,0 +1,60 @@
+import contextlib
+
+from support.cache import ResponseCache
+from support.client import Client
+from support.metrics import MetricsRecorder
+from support.streaming import iter_json_array
+from support.stub_server import StubServer
+
+
+def test_get_cache_hits_revalidates_and_invalidates():
+    now = [0.0]
+    cache = ResponseCache(ttl=10, clock=lambda: now[0])
+    metrics = MetricsRecorder()
+
+    def requests_sent():
+        return {
+            f"{method} {route}": sorted(stats.statuses.items())
+            for (method, route), stats in metrics.endpoints.items()
+        }
+
+    with StubServer() as server:
+        client = Client(server.base_url, "token", metrics=metrics, cache=cache)
+        first = client.get("/posts", params={"page": 1})
+        assert client.get("/posts", params={"page": "1"}) is first
+        assert requests_sent() == {"GET /posts": [(200, 1)]}
+
+        now[0] = 11
+        assert client.get("/posts", params={"page": 1}).json() == first.json()
+        assert requests_sent() == {"GET /posts": [(200, 1), (304, 1)]}
+
+        # deleting a user drops cached pages of its posts too
+        user_id = client.get("/users").json()[0]["id"]
+        assert client.delete(f"/users/{user_id}").status_code == 204
+        client.get("/posts", params={"page": 1})
+        assert requests_sent()["GET /posts"] == [(200, 2), (304, 1)]
+
+    assert (cache.hits, cache.revalidated) == (1, 1)
+
+
+def test_streamed_list_reads_are_cached_and_revalidated():
+    now = [0.0]
+    cache = ResponseCache(ttl=10, clock=lambda: now[0])
+    metrics = MetricsRecorder()
+
+    def read_users():
+        response = client.get("/users", params={"page": 1}, stream=True)
+        with contextlib.closing(response):
+            return list(iter_json_array(response.iter_content(64)))
+
+    with StubServer() as server:
+        client = Client(server.base_url, "token", metrics=metrics, cache=cache)
+        users = read_users()
+        assert users
+        assert read_users() == users
+        now[0] = 11
+        assert read_users() == users
+        statuses = metrics.endpoints["GET", "/users"].statuses
+
+    assert sorted(statuses.items()) == [(200, 1), (304, 1)]
+    assert (cache.hits, cache.revalidated) == (1, 1)
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_pytest(*args):
+    env = dict(os.environ)
+    for name in ("GOREST_CASSETTE", "PYTEST_WORKERS"):
+        env.pop(name, None)
+    return subprocess.run(
+        [sys.executable, "-m", "pytest", "tests/test_create_user.py", "--offline"]
+        + ["-q", "-p", "no:cacheprovider", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+@pytest.mark.parametrize("spelling", ["space", "equals"])
+def test_recorded_run_replays(tmp_path, spelling):
+    # with "--cassette DIR", pytest counts an existing DIR when picking the
+    # rootdir, so node ids differ between recording and replaying
+    path = str(tmp_path / "cassette")
+    args = ["--cassette", path] if spelling == "space" else [f"--cassette={path}"]
+
+    recorded = run_pytest(*args)
+    assert recorded.returncode == 0, recorded.stdout
+    replayed = run_pytest(*args, "--cassette-mode=replay")
+    assert replayed.returncode == 0, replayed.stdout
+    assert "CassetteMiss" not in replayed.stdout
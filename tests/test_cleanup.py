@@ -0,0 +1,73 @@
+from support.cleanup import DeletionQueue, ResourceTracker
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.text = ""
+
+    def json(self):
+        return self.body
+
+
+class Client:
+    def __init__(self, tracker, statuses):
+        self.tracker = tracker
+        self.statuses = statuses
+        self.deletes = []
+
+    def delete(self, path):
+        self.deletes.append(path)
+        response = Response(self.statuses.get(path, 204))
+        self.tracker.forget(path, response)
+        return response
+
+
+def test_deleting_a_user_forgets_their_posts_and_todos():
+    tracker = ResourceTracker()
+    tracker.record("/users", Response(201, {"id": 1}))
+    tracker.record("/users", Response(201, {"id": 2}))
+    tracker.record("/users/1/posts", Response(201, {"id": 10, "user_id": 1}))
+    tracker.record("/users/1/todos", Response(201, {"id": 11, "user_id": 1}))
+    tracker.record("/users/2/posts", Response(201, {"id": 12, "user_id": 2}))
+
+    tracker.forget("/users/1", Response(204))
+    assert tracker.pending() == ["/users/2", "/posts/12"]
+    assert tracker.created == 5
+
+
+def test_already_deleted_resources_are_not_counted_as_deleted():
+    tracker = ResourceTracker()
+    tracker.record("/users", Response(201, {"id": 1}))
+    tracker.record("/users", Response(201, {"id": 2}))
+    client = Client(tracker, {"/users/2": 404})
+
+    deletions = DeletionQueue(client, tracker, concurrency=2).drain()
+    assert (deletions.deleted, deletions.gone, deletions.leaked) == (1, 1, [])
+    assert deletions.summary() == (
+        "2 created, 1 deleted at teardown (0 more with their user),"
+        " 1 already gone, 0 leaked"
+    )
+    assert tracker.pending() == []
+
+
+def test_children_of_queued_users_are_left_to_the_cascade():
+    tracker = ResourceTracker()
+    tracker.record("/users", Response(201, {"id": 1}))
+    tracker.record("/users", Response(201, {"id": 2}))
+    tracker.record("/users/1/posts", Response(201, {"id": 10, "user_id": 1}))
+    tracker.record("/users/1/todos", Response(201, {"id": 11, "user_id": 1}))
+    tracker.record("/users/2/posts", Response(201, {"id": 12, "user_id": 2}))
+    # owned by a user created outside the suite
+    tracker.record("/users/9/todos", Response(201, {"id": 13, "user_id": 9}))
+    client = Client(tracker, {"/users/2": 500})
+
+    deletions = DeletionQueue(client, tracker, concurrency=4).drain()
+    assert sorted(client.deletes) == ["/todos/13", "/users/1", "/users/2"]
+    assert (deletions.deleted, deletions.cascaded, deletions.gone) == (2, 2, 0)
+    assert deletions.leaked == [
+        ("/users/2", "500 "),
+        ("/posts/12", "not deleted with /users/2"),
+    ]
+    assert tracker.pending() == ["/users/2", "/posts/12"]
@@ -0,0 +1,67 @@
+import threading
+
+from support.client import AsyncClient, Client
+from support.singleflight import SingleFlight
+from support.stub_server import StubServer
+from support.transport import TransportConfig
+
+
+def test_async_client_threads_have_their_own_sessions():
+    with StubServer() as server:
+        client = Client(server.base_url, "token")
+        adapter = TransportConfig(concurrency=4).apply(client)
+        sessions = {}
+        lock = threading.Lock()
+
+        def get(endpoint):
+            response = client.get(endpoint)
+            with lock:
+                sessions[threading.get_ident()] = client.thread_session()
+            return response.status_code
+
+        async_client = AsyncClient(client, concurrency=4)
+
+        async def send(i):
+            return await async_client._call(get, f"/users?page={i}")
+
+        statuses = async_client.gather(*(send(i) for i in range(16)))
+        async_client.close()
+
+    assert statuses == [200] * 16
+    assert client.session not in sessions.values()
+    assert len({id(s) for s in sessions.values()}) == len(sessions)
+    for session in sessions.values():
+        assert session.adapters["http://"] is adapter
+        assert session.headers is client.session.headers
+
+
+def test_get_after_a_write_does_not_join_a_get_sent_before_it():
+    with StubServer() as server:
+        client = Client(server.base_url, "token", coalescer=SingleFlight())
+        user_id = client.get("/users").json()[0]["id"]
+        path = f"/users/{user_id}"
+        fetch = client._fetch
+        in_flight = threading.Event()
+        release = threading.Event()
+
+        def slow_fetch(*args):
+            response = fetch(*args)
+            if not in_flight.is_set():
+                in_flight.set()
+                release.wait(5)
+            return response
+
+        client._fetch = slow_fetch
+        before = []
+        thread = threading.Thread(target=lambda: before.append(client.get(path)))
+        thread.start()
+        assert in_flight.wait(5)
+
+        assert client.put(path, data={"name": "Renamed"}).status_code == 200
+        after = client.get(path)
+        release.set()
+        thread.join()
+
+    assert after.json()["name"] == "Renamed"
+    assert before[0].json()["name"] != "Renamed"
+    assert client.coalescer.shared == 0
@@ -0,0 +1,34 @@
+import json
+
+from support.client import Client
+from support.metrics import MetricsRecorder
+from support.stub_server import StubServer
+from support.transport import TransportConfig
+
+
+def test_compressed_responses_are_decoded_and_accounted():
+    metrics = MetricsRecorder()
+    with StubServer() as server:
+        client = Client(server.base_url, "token", metrics=metrics)
+        TransportConfig().apply(client)
+        params = {"per_page": 50}
+
+        response = client.get("/posts", params=params)
+        assert response.headers["Content-Encoding"] in ("gzip", "br")
+        posts = response.json()
+        assert len(posts) == 50
+
+        streamed = client.get("/posts", params=params, stream=True)
+        body = b"".join(streamed.iter_content(128))
+        assert json.loads(body) == posts
+
+        TransportConfig(compression=False).apply(client)
+        plain = client.get("/posts", params=params)
+        assert "Content-Encoding" not in plain.headers
+        assert plain.json() == posts
+
+    stats = metrics.summary()["GET /posts"]
+    assert stats["bytes"] == 3 * len(body)
+    wire_compressed = stats["wire_bytes"] - len(body)
+    assert wire_compressed == 2 * int(response.headers["Content-Length"])
+    assert wire_compressed < len(body)
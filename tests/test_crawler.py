@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from support.client import Client
+from support.crawler import CollectionCrawler, CrawlError
+from support.stub_server import StubServer
+
+
+class CountingClient:
+    """Delegates to ``client``, counting the GETs in flight at once."""
+
+    def __init__(self, client, fail_page=None):
+        self.client = client
+        self.fail_page = fail_page
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.pages = []
+
+    def get(self, endpoint, params=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.pages.append(params["page"])
+        try:
+            if params["page"] == self.fail_page:
+                return self.client.get("/no-such-collection")
+            return self.client.get(endpoint, params=params)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def stub_client():
+    with StubServer(seed_size=60) as server:
+        yield Client(server.base_url, "token")
+
+
+def test_crawler_walks_every_page_in_order(stub_client):
+    client = CountingClient(stub_client)
+    crawler = CollectionCrawler(client, "/users", per_page=7, window=3)
+    pages = list(crawler.iter_pages())
+
+    assert [page for page, _ in pages] == list(range(1, 10))
+    ids = [record["id"] for _, records in pages for record in records]
+    assert len(ids) == len(set(ids)) == 60
+    assert (crawler.total, crawler.pages, crawler.drift) == (60, 9, [])
+    assert sorted(client.pages) == list(range(1, 10))
+    assert client.max_in_flight <= 3
+
+
+def test_crawler_records_drift_when_the_collection_grows(stub_client):
+    crawler = CollectionCrawler(stub_client, "/users", per_page=7, window=1)
+    data = {"name": "New", "email": "new@example.com", "gender": "male"}
+    for page, _ in crawler.iter_pages():
+        if page == 1:
+            response = stub_client.post("/users", {**data, "status": "active"})
+            assert response.status_code == 201
+
+    assert crawler.drift[0] == {
+        "page": 2,
+        "expected_total": 60,
+        "total": 61,
+        "expected_pages": 9,
+        "pages": 9,
+    }
+    assert len(crawler.drift) == 8
+
+
+def test_crawler_stops_at_a_short_page_when_records_are_deleted(stub_client):
+    client = CountingClient(stub_client)
+    crawler = CollectionCrawler(client, "/users", per_page=7, window=1)
+    seen = []
+    for page, records in crawler.iter_pages():
+        seen.append((page, len(records)))
+        if page == 1:
+            for user_id in range(1, 31, 3):
+                assert stub_client.delete(f"/users/{user_id}").status_code == 204
+
+    # 50 users left: page 8 has one record and page 9 is not read
+    assert seen[-1] == (8, 1)
+    assert [page for page, _ in seen] == list(range(1, 9))
+    assert crawler.drift and crawler.drift[0]["total"] == 50
+    assert 9 not in client.pages
+
+
+def test_crawler_raises_when_a_later_page_fails(stub_client):
+    client = CountingClient(stub_client, fail_page=3)
+    crawler = CollectionCrawler(client, "/users", per_page=7, window=2)
+    pages = []
+    with pytest.raises(CrawlError, match="page 3 returned 404"):
+        for page, _ in crawler.iter_pages():
+            pages.append(page)
+    assert pages == [1, 2]
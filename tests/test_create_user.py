@@ -1,37 +1,16 @@
 import pytest
 
+from support import scenarios
 
-def test_create_user_ok(
-    rest_client, response_is_json, get_schema, fake, validate_jsonschema
-):
-    name = fake.name()
-    email = fake.email()
-    gender = fake.random_element(["male", "female"])
-    status = fake.random_element(["active", "inactive"])
-    data = {
-        "name": name,
-        "email": email,
-        "gender": gender,
-        "status": status,
-    }
 
-    response = rest_client.post("/users", data=data)
-    assert response.status_code == 201
-    assert response_is_json(response)
-    result = response.json()
+def test_create_user_ok(rest_client, get_schema, payloads, validate_jsonschema):
+    data = payloads("user").next()
+
+    result = scenarios.create_user(rest_client, data)
 
     schema = get_schema("user")
     validate_jsonschema(result, schema)
 
-    assert result["name"] == name
-    assert result["email"] == email
-    assert result["gender"] == gender
-    assert result["status"] == status
-
-    assert "id" in result
-    assert isinstance(result["id"], int)
-    assert result["id"] > 0
-
 
 @pytest.mark.parametrize(
     ("data", "expected_messages"),
@@ -177,20 +156,13 @@ def test_create_user_ok(
         ),
     ),
 )
-def test_create_user_invalid_data(
-    rest_client, data, expected_messages, fake, response_is_json
-):
-    data = data.copy()
-    if data.get("name") == "<random>":
-        data["name"] = fake.name()
-    if data.get("email") == "<random>":
-        data["email"] = fake.email()
+def test_create_user_invalid_data(request, fan_out, data, expected_messages, payloads):
+    async def send(client, data, **_):
+        data = payloads("user").fill(data)
+        return await client.post("/users", data=data)
 
-    response = rest_client.post("/users", data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    response = fan_out(request, send)
+    result = scenarios.validation_errors(response)
 
     sorted_result = sorted(result, key=lambda x: x["field"])
     sorted_expected = sorted(expected_messages, key=lambda x: x["field"])
@@ -1,35 +1,23 @@
 import pytest
 
+from support import scenarios
+
 
 def test_create_user_post_ok(
-    create_user, rest_client, fake, response_is_json, get_schema, validate_jsonschema
+    existing_user,
+    rest_client,
+    payloads,
+    get_schema,
+    validate_jsonschema,
 ):
-    user_id = create_user()
-    title = fake.sentence(nb_words=6)
-    body = fake.text(max_nb_chars=200)
-    data = {
-        "user_id": user_id,
-        "title": title,
-        "body": body,
-    }
+    user_id = existing_user
+    data = {"user_id": user_id, **payloads("post").next()}
 
-    path = f"/users/{user_id}/posts"
-    response = rest_client.post(path, data=data)
-    assert response.status_code == 201
-    assert response_is_json(response)
-    result = response.json()
+    result = scenarios.create_user_post(rest_client, user_id, data)
 
     schema = get_schema("post")
     validate_jsonschema(result, schema)
 
-    assert result["user_id"] == user_id
-    assert result["title"] == title
-    assert result["body"] == body
-
-    assert "id" in result
-    assert isinstance(result["id"], int)
-    assert result["id"] > 0
-
 
 @pytest.mark.parametrize(
     ("data", "expected_messages"),
@@ -82,41 +70,31 @@ def test_create_user_post_ok(
     ),
 )
 def test_create_user_post_invalid_data(
-    rest_client, create_user, data, expected_messages, fake, response_is_json
+    request,
+    fan_out,
+    existing_user,
+    data,
+    expected_messages,
+    payloads,
 ):
-    data = data.copy()
-    if data.get("title") == "<random>":
-        data["title"] = fake.sentence(nb_words=6)
-    if data.get("body") == "<random>":
-        data["body"] = fake.text(max_nb_chars=200)
+    async def send(client, data, **_):
+        data = payloads("post").fill(data)
+        path = f"/users/{existing_user}/posts"
+        return await client.post(path, data=data)
 
-    user_id = create_user()
-    path = f"/users/{user_id}/posts"
-    response = rest_client.post(path, data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    response = fan_out(request, send)
+    result = scenarios.validation_errors(response)
 
     sorted_result = sorted(result, key=lambda x: x["field"])
     sorted_expected = sorted(expected_messages, key=lambda x: x["field"])
     assert sorted_result == sorted_expected
 
 
-def test_create_user_post_non_existing_user(rest_client, fake, response_is_json):
+def test_create_user_post_non_existing_user(rest_client, payloads):
     user_id = -1  # Assuming this user ID does not exist
-    title = fake.sentence(nb_words=6)
-    body = fake.text(max_nb_chars=200)
-    data = {
-        "user_id": user_id,
-        "title": title,
-        "body": body,
-    }
+    data = {"user_id": user_id, **payloads("post").next()}
 
     path = f"/users/{user_id}/posts"
     response = rest_client.post(path, data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    result = scenarios.validation_errors(response)
     assert result == [{"field": "user", "message": "must exist"}]
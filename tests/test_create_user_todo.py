@@ -1,7 +1,6 @@
 import pytest
-from datetime import timezone, timedelta
 
-STATUSES = ["pending", "completed"]
+from support import scenarios
 
 
 @pytest.mark.parametrize(
@@ -25,42 +24,21 @@ STATUSES = ["pending", "completed"]
     ),
 )
 def test_create_user_todo_ok(
-    create_user,
+    existing_user,
     rest_client,
     data,
-    fake,
-    response_is_json,
+    payloads,
     get_schema,
     validate_jsonschema,
 ):
-    user_id = create_user()
-    data = data.copy()
-    if data.get("title") == "<random>":
-        data["title"] = fake.sentence(nb_words=6)
-    if data.get("due_on") == "<random>":
-        tz = timezone(timedelta(hours=5, minutes=30))
-        data["due_on"] = fake.date_time(tzinfo=tz).isoformat(timespec="milliseconds")
-    if data.get("status") == "<random>":
-        data["status"] = fake.random_element(STATUSES)
+    user_id = existing_user
+    data = payloads("todo").fill(data)
 
-    path = f"/users/{user_id}/todos"
-    response = rest_client.post(path, data=data)
-    assert response.status_code == 201
-    assert response_is_json(response)
-    result = response.json()
+    result = scenarios.create_user_todo(rest_client, user_id, data)
 
     schema = get_schema("todo")
     validate_jsonschema(result, schema)
 
-    assert result["user_id"] == user_id
-    assert result["title"] == data.get("title")
-    assert result["due_on"] == data.get("due_on")
-    assert result["status"] == data.get("status")
-
-    assert "id" in result
-    assert isinstance(result["id"], int)
-    assert result["id"] > 0
-
 
 @pytest.mark.parametrize(
     ("data", "expected_messages"),
@@ -116,44 +94,31 @@ def test_create_user_todo_ok(
     ),
 )
 def test_create_user_todo_invalid_data(
-    rest_client, create_user, data, expected_messages, fake, response_is_json
+    request,
+    fan_out,
+    existing_user,
+    data,
+    expected_messages,
+    payloads,
 ):
-    data = data.copy()
-    if data.get("title") == "<random>":
-        data["title"] = fake.sentence(nb_words=6)
-    if data.get("status") == "<random>":
-        data["status"] = fake.random_element(STATUSES)
-    if data.get("due_on") == "<random>":
-        tz = timezone(timedelta(hours=5, minutes=30))
-        data["due_on"] = fake.date_time(tzinfo=tz).isoformat(timespec="milliseconds")
+    async def send(client, data, **_):
+        data = payloads("todo").fill(data)
+        path = f"/users/{existing_user}/todos"
+        return await client.post(path, data=data)
 
-    user_id = create_user()
-    path = f"/users/{user_id}/todos"
-    response = rest_client.post(path, data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    response = fan_out(request, send)
+    result = scenarios.validation_errors(response)
 
     sorted_result = sorted(result, key=lambda x: x["field"])
     sorted_expected = sorted(expected_messages, key=lambda x: x["field"])
     assert sorted_result == sorted_expected
 
 
-def test_create_user_todo_non_existing_user(rest_client, fake, response_is_json):
+def test_create_user_todo_non_existing_user(rest_client, payloads):
     user_id = -1  # Assuming this user ID does not exist
-    title = fake.sentence(nb_words=6)
-    status = fake.random_element(STATUSES)
-    data = {
-        "user_id": user_id,
-        "title": title,
-        "status": status,
-    }
+    data = {"user_id": user_id, **payloads("todo").next()}
 
     path = f"/users/{user_id}/todos"
     response = rest_client.post(path, data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    result = scenarios.validation_errors(response)
     assert result == [{"field": "user", "message": "must exist"}]
@@ -0,0 +1,69 @@
+from support.diagnostics import (
+    MAX_CHARS,
+    MAX_ERRORS,
+    ValidationFailure,
+    collect_errors,
+)
+from support.validation import ValidatorRegistry
+
+
+def users_schema(get_schema):
+    return {"type": "array", "items": get_schema("user")}
+
+
+def test_large_instance_reports_only_offending_items(get_schema):
+    users = [
+        {
+            "id": i,
+            "name": "Ann Lee " * 50,
+            "email": f"ann{i}@example.com",
+            "gender": "female",
+            "status": "active",
+        }
+        for i in range(1, 5001)
+    ]
+    users[7]["gender"] = "unknown"
+    users[4321]["id"] = "4322"
+    validator = ValidatorRegistry().get(users_schema(get_schema))
+
+    errors, more = collect_errors(validator, users)
+    assert not more
+    assert [path for path, _ in errors] == [[7, "gender"], [4321, "id"]]
+
+    message = ValidationFailure(users, errors).render()
+    assert "$[7].gender -> 'unknown' is not one of" in message
+    assert "$[4321].id -> '4322' is not of type 'integer'" in message
+    assert '$[7]:\n{\n  "id": 8,' in message
+    assert "$[4321]:\n" in message
+    assert "[TRUNCATED]" in message
+    # two truncated items, not the 5000 of them
+    assert len(message) < 4 * MAX_CHARS
+
+
+def test_error_collection_is_capped(get_schema):
+    validator = ValidatorRegistry().get(users_schema(get_schema))
+    consumed = []
+    all_errors = validator.iter_errors
+
+    def iter_errors(instance):
+        for error in all_errors(instance):
+            consumed.append(error)
+            yield error
+
+    validator.iter_errors = iter_errors
+    errors, more = collect_errors(validator, [{}] * 1000)
+    assert more
+    assert len(errors) == MAX_ERRORS
+    assert len(consumed) == MAX_ERRORS + 1
+    message = ValidationFailure([{}] * 1000, errors, more=more).render()
+    assert f"only the first {MAX_ERRORS} errors" in message
+
+
+def test_streamed_item_paths_are_relative_to_the_array():
+    failure = ValidationFailure(
+        {"id": 1, "email": 5}, [(["email"], "5 is not of type 'string'")], root=[3]
+    )
+    message = failure.render()
+    assert "$[3].email -> 5 is not of type 'string'" in message
+    assert '$[3]:\n{\n  "id": 1,\n  "email": 5\n}' in message
+    assert "[TRUNCATED]" not in message
@@ -1,15 +1,10 @@
 import pytest
 
-
-@pytest.fixture(scope="module")
-def posts_list(rest_client, response_is_json):
-    response = rest_client.get("/posts")
-    assert response.status_code == 200
-    assert response_is_json(response)
-    return response.json()
+from support import scenarios
 
 
-def test_get_posts_schema(posts_list, get_schema, validate_jsonschema):
+@pytest.fixture(scope="module")
+def posts_check(check_collection, get_schema):
     schema = {
         "$schema": "http://json-schema.org/draft-07/schema#",
         "definitions": {
@@ -19,12 +14,20 @@ def test_get_posts_schema(posts_list, get_schema, validate_jsonschema):
         "minItems": 1,
         "items": {"$ref": "#/definitions/post"},
     }
-    validate_jsonschema(posts_list, schema)
+    return check_collection("/posts", schema)
 
 
-def test_get_posts_unique_ids(posts_list):
-    ids = [post["id"] for post in posts_list]
-    assert sorted(ids) == sorted(list((set(ids)))), "Post IDs are not unique"
+def test_get_posts_schema(posts_check, fail_validation):
+    failure, _ = posts_check
+    if failure is not None:
+        fail_validation(failure)
+
+
+def test_get_posts_unique_ids(posts_check):
+    _, detector = posts_check
+    assert not detector.duplicates, (
+        f"Post IDs are not unique:\n{detector.describe()}"
+    )
 
 
 @pytest.mark.parametrize(
@@ -55,16 +58,8 @@ def test_get_posts_pagination(
     page,
     per_page,
     expected_number_of_posts,
-    response_is_json,
 ):
-    response = rest_client.get("/posts", params={"page": page, "per_page": per_page})
-    assert response.status_code == 200
-    assert response_is_json(response)
-    headers = response.headers
-    assert headers.get("X-Pagination-Page") == str(page)
-    assert headers.get("X-Pagination-Limit") == str(per_page)
-
-    posts = response.json()
+    posts = scenarios.get_page(rest_client, "posts", page, per_page)
     assert len(posts) == expected_number_of_posts
 
     
@@ -1,15 +1,10 @@
 import pytest
 
-
-@pytest.fixture(scope="module")
-def todos_list(rest_client, response_is_json):
-    response = rest_client.get("/todos")
-    assert response.status_code == 200
-    assert response_is_json(response)
-    return response.json()
+from support import scenarios
 
 
-def test_get_todos_schema(todos_list, get_schema, validate_jsonschema):
+@pytest.fixture(scope="module")
+def todos_check(check_collection, get_schema):
     schema = {
         "$schema": "http://json-schema.org/draft-07/schema#",
         "definitions": {
@@ -20,12 +15,20 @@ def test_get_todos_schema(todos_list, get_schema, validate_jsonschema):
         "items": {"$ref": "#/definitions/todo"},
         "uniqueItems": True,
     }
-    validate_jsonschema(todos_list, schema)
+    return check_collection("/todos", schema)
 
 
-def test_get_todos_unique_ids(todos_list):
-    ids = [post["id"] for post in todos_list]
-    assert sorted(ids) == sorted(list((set(ids)))), "Post IDs are not unique"
+def test_get_todos_schema(todos_check, fail_validation):
+    failure, _ = todos_check
+    if failure is not None:
+        fail_validation(failure)
+
+
+def test_get_todos_unique_ids(todos_check):
+    _, detector = todos_check
+    assert not detector.duplicates, (
+        f"Todo IDs are not unique:\n{detector.describe()}"
+    )
 
 
 @pytest.mark.parametrize(
@@ -53,17 +56,9 @@ def test_get_todos_unique_ids(todos_list):
 )
 def test_get_todos_pagination(
     rest_client,
-    response_is_json,
     page,
     per_page,
     expected_number_of_todos,
 ):
-    response = rest_client.get("/todos", params={"page": page, "per_page": per_page})
-    assert response.status_code == 200
-    assert response_is_json(response)
-    headers = response.headers
-    assert headers.get("X-Pagination-Page") == str(page)
-    assert headers.get("X-Pagination-Limit") == str(per_page)
-
-    todos = response.json()
+    todos = scenarios.get_page(rest_client, "todos", page, per_page)
     assert len(todos) == expected_number_of_todos
@@ -1,15 +1,10 @@
 import pytest
 
-
-@pytest.fixture(scope="module")
-def users_list(rest_client, response_is_json):
-    response = rest_client.get("/users")
-    assert response.status_code == 200
-    assert response_is_json(response)
-    return response.json()
+from support import scenarios
 
 
-def test_get_users_schema(users_list, get_schema, validate_jsonschema):
+@pytest.fixture(scope="module")
+def users_check(check_collection, get_schema):
     schema = {
         "$schema": "http://json-schema.org/draft-07/schema#",
         "definitions": {
@@ -19,12 +14,20 @@ def test_get_users_schema(users_list, get_schema, validate_jsonschema):
         "minItems": 1,
         "items": {"$ref": "#/definitions/user"},
     }
-    validate_jsonschema(users_list, schema)
+    return check_collection("/users", schema)
 
 
-def test_get_users_unique_ids(users_list):
-    ids = [user["id"] for user in users_list]
-    assert sorted(ids) == sorted(list((set(ids)))), "User IDs are not unique"
+def test_get_users_schema(users_check, fail_validation):
+    failure, _ = users_check
+    if failure is not None:
+        fail_validation(failure)
+
+
+def test_get_users_unique_ids(users_check):
+    _, detector = users_check
+    assert not detector.duplicates, (
+        f"User IDs are not unique:\n{detector.describe()}"
+    )
 
 
 @pytest.mark.parametrize(
@@ -55,14 +58,6 @@ def test_get_users_pagination(
     page,
     per_page,
     expected_number_of_users,
-    response_is_json,
 ):
-    response = rest_client.get("/users", params={"page": page, "per_page": per_page})
-    assert response.status_code == 200
-    assert response_is_json(response)
-    headers = response.headers
-    assert headers.get("X-Pagination-Page") == str(page)
-    assert headers.get("X-Pagination-Limit") == str(per_page)
-
-    users = response.json()
+    users = scenarios.get_page(rest_client, "users", page, per_page)
     assert len(users) == expected_number_of_users
@@ -0,0 +1,47 @@
+import itertools
+import threading
+import time
+
+from support.hedging import Hedger
+
+
+class Response:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_slow_get_is_hedged_within_budget():
+    hedger = Hedger(budget=0.25, min_samples=3)
+    release = threading.Event()
+    responses = []
+    attempts = itertools.count()
+
+    def get():
+        attempt = next(attempts)
+        if attempt == 3:
+            # the first slow GET hangs until released
+            release.wait(5)
+        elif attempt == 5:
+            time.sleep(0.05)
+        responses.append(Response(attempt))
+        return responses[-1]
+
+    for _ in range(3):
+        hedger.do("/users/1", get)
+    assert hedger.threshold("/users/{id}") is not None
+
+    assert hedger.do("/users/2", get).name == 4
+    assert (hedger.hedged, hedger.won) == (1, 1)
+    # a second hedge would be more than a quarter of five GETs
+    assert hedger.do("/users/3", get).name == 5
+    assert hedger.hedged == 1
+
+    release.set()
+    hedger.executor.shutdown(wait=True)
+    assert [r.name for r in responses if r.closed] == [3]
+    assert hedger.saved > 0
+    assert hedger.summary().startswith("1 of 5 hedged (20.0%), 1 hedges won")
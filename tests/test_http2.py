@@ -0,0 +1,38 @@
+import pytest
+
+from support.client import Client
+from support.stub_server import StubServer
+from support.transport import TransportConfig
+
+pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+
+def test_http2_transport_behind_client():
+    with StubServer() as server:
+        client = Client(server.base_url, "token")
+        transport = TransportConfig(concurrency=4, http2=True)
+        transport.apply(client)
+        assert transport.warm_up(client, 4) == 1
+
+        # the stub speaks HTTP/1.1 only, httpx falls back to it over http://
+        response = client.get("/users")
+        assert response.status_code == 200
+        assert response.json()
+        assert response.elapsed.total_seconds() > 0
+
+        streamed = client.get("/users", stream=True)
+        assert b"".join(streamed.iter_content(64)) == response.content
+
+        created = client.post(
+            "/users",
+            {
+                "name": "Ann Lee",
+                "email": "ann.lee.http2@example.com",
+                "gender": "female",
+                "status": "active",
+            },
+        )
+        assert created.status_code == 201
+        assert client.delete(f"/users/{created.json()['id']}").status_code == 204
+        client.session.close()
@@ -0,0 +1,108 @@
+import contextlib
+import types
+
+import pytest
+
+from support.cleanup import DeletionQueue, ResourceTracker
+from support.client import Client
+from support.load import SCENARIOS, LoadRunner
+from support.metrics import MetricsRecorder
+from support.payloads import PayloadFactory
+from support.stub_server import StubServer
+
+OPTIONS = {
+    "load_concurrency": 4,
+    "load_duration": 1.0,
+    "load_ramp_up": 0.0,
+    "load_rps": 200,
+    "load_max_error_rate": 0.0,
+    "load_scenario": None,
+}
+
+
+class FakeConfig:
+    def __init__(self, **options):
+        self.options = {**OPTIONS, **options}
+        self.latency = MetricsRecorder()
+
+    def getoption(self, name):
+        return self.options[name]
+
+
+@pytest.fixture
+def make_runner(get_schema):
+    def make_runner_(path="", **options):
+        config = FakeConfig(**options)
+
+        @contextlib.contextmanager
+        def open_api_target(config):
+            with StubServer(seed_size=20) as server:
+                yield server.base_url + path, "token"
+
+        def build_client(config, base_url, token):
+            config.client = Client(
+                base_url, token, tracker=ResourceTracker(), metrics=config.latency
+            )
+            return config.client
+
+        def make_payloads(config, stream=None):
+            return PayloadFactory(get_schema, seed=1, tag=stream)
+
+        def clean_up_resources(config, client):
+            config.leftovers = client.tracker.pending()
+            DeletionQueue(client, client.tracker).drain()
+
+        return LoadRunner(
+            config, open_api_target, build_client, make_payloads, clean_up_resources
+        )
+
+    return make_runner_
+
+
+def run(runner):
+    session = types.SimpleNamespace(testsfailed=0)
+    assert runner.pytest_runtestloop(session) is True
+    return session
+
+
+def test_load_run_counts_requests_and_stops_at_the_deadline(make_runner):
+    runner = make_runner()
+    session = run(runner)
+    config = runner.config
+
+    assert session.testsfailed == 0
+    assert runner.error_rate() == 0.0
+    # scenarios started before the deadline run to their end, but no later
+    assert 1.0 <= runner.elapsed < 2.0
+    iterations = runner.results.iterations
+    assert set(iterations) == set(SCENARIOS)
+    expected = sum(
+        count * len(SCENARIOS[scenario][1]) for scenario, count in iterations.items()
+    )
+    assert runner.requests == expected
+    # paced to the target rate, the first request of each slot goes at once
+    assert runner.requests <= 200 * runner.elapsed + 1
+
+    summary = config.latency.summary()
+    journeys, invalid = iterations["journey"], iterations["invalid"]
+    assert summary["POST /users"]["statuses"] == {"201": journeys, "422": invalid}
+    assert summary["POST /users/{id}/posts"]["requests"] == journeys
+    assert summary["PUT /users/{id}"]["statuses"] == {"200": journeys}
+    for collection in ("users", "posts", "todos"):
+        assert summary[f"GET /{collection}"]["requests"] == iterations["browse"]
+    # every journey deletes its user, and the cleanup requests came after
+    assert config.leftovers == []
+    assert summary["DELETE /users/{id}"]["statuses"] == {"204": journeys}
+
+
+def test_load_run_fails_above_the_error_rate(make_runner):
+    runner = make_runner(
+        path="/missing", load_duration=0.2, load_scenario=["journey=0", "invalid=0"]
+    )
+    session = run(runner)
+
+    assert session.testsfailed == 1
+    assert runner.error_rate() == 1.0
+    error = "browse/list_users: AssertionError: assert 404 == 200"
+    assert set(runner.results.errors) == {error}
+    assert runner.requests == runner.results.iterations["browse"]
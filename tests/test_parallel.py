@@ -0,0 +1,85 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from support.metrics import MetricsRecorder
+from support.parallel import ParallelRunner, WorkerReports, _worker_args, worker_path
+
+
+def test_worker_args_give_each_worker_its_own_report_files():
+    args = [
+        "--workers",
+        "2",
+        "--latency-json",
+        "out/latency.json",
+        "--report-jsonl=out/results.jsonl",
+        "-q",
+    ]
+    assert _worker_args(args, 1, 2) == [
+        "--latency-json=out/latency-w1.json",
+        "--report-jsonl=out/results-w1.jsonl",
+        "-q",
+        "--shard=1/2",
+    ]
+
+
+def test_worker_latency_files_merge(tmp_path):
+    paths = []
+    for index, seconds in enumerate((0.010, 0.030)):
+        recorder = MetricsRecorder()
+        recorder.record("GET", "/users/1", 200, 100, None, seconds / 2, seconds)
+        recorder.record("GET", "/users/2", 404, 10, 0.001, seconds, seconds)
+        paths.append(tmp_path / f"latency-w{index}.json")
+        recorder.write_json(paths[-1])
+
+    merged = MetricsRecorder()
+    for path in paths:
+        merged.merge_json(path)
+    stats = merged.summary()["GET /users/{id}"]
+    assert stats["requests"] == 4
+    assert stats["statuses"] == {"200": 2, "404": 2}
+    assert stats["bytes"] == 220
+    assert stats["total"]["max"] == 0.030
+    assert stats["connect"]["count"] == 2
+
+
+def test_worker_reports_round_trip(tmp_path, pytestconfig):
+    report = pytest.TestReport(
+        "test_x.py::test_fails",
+        ("test_x.py", 3, "test_fails"),
+        {},
+        "failed",
+        "assert 1 == 2",
+        "call",
+    )
+    plugin = WorkerReports(pytestconfig, worker_path(tmp_path / "reports.jsonl", 0))
+    plugin.pytest_runtest_logreport(report)
+    plugin.pytest_unconfigure(pytestconfig)
+
+    runner = ParallelRunner(pytestconfig, workers=2)
+    (replayed,) = runner.worker_reports(str(tmp_path / "reports.jsonl"))
+    assert (replayed.nodeid, replayed.outcome, replayed.when) == (
+        report.nodeid,
+        "failed",
+        "call",
+    )
+    assert str(replayed.longrepr) == "assert 1 == 2"
+
+
+def test_parallel_summary_counts_the_workers_tests():
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--offline", "--workers=2", "-q"]
+        + ["-p", "no:cacheprovider", "test_payloads.py"],
+        cwd=tests_dir,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout
+    worker_lines = re.findall(r"^(\d+) passed, \d+ deselected", result.stdout, re.M)
+    assert len(worker_lines) == 2
+    final_line = result.stdout.strip().splitlines()[-1]
+    assert re.match(rf"{sum(map(int, worker_lines))} passed in ", final_line)
@@ -0,0 +1,39 @@
+import pytest
+
+from support.payloads import PayloadGenerator
+
+
+@pytest.mark.parametrize("name", ("user", "post", "todo"))
+def test_generated_payloads_are_valid(name, get_schema, validators):
+    schema = get_schema(name)
+    generator = PayloadGenerator(schema, seed=1, batch_size=64)
+    payloads = [generator.next() for _ in range(200)]
+
+    # server-assigned fields are not part of the request payloads
+    response_schema = {**schema, "required": list(generator.fields)}
+    validator = validators.get(response_schema)
+    assert all(validator.is_valid(payload) for payload in payloads)
+    assert PayloadGenerator(schema, seed=1, batch_size=64).next() == payloads[0]
+
+
+def test_generated_emails_are_unique(get_schema):
+    generator = PayloadGenerator(get_schema("user"), seed=1, tag="w0")
+    emails = {generator.next()["email"] for _ in range(5000)}
+    assert len(emails) == 5000
+    assert all(".w0@" in email for email in emails)
+
+
+def test_invalid_variants_break_one_field(get_schema):
+    generator = PayloadGenerator(get_schema("todo"), seed=1)
+    variants = {
+        variant_id: payload for variant_id, _, payload in generator.invalid_variants()
+    }
+    assert sorted(variants) == [
+        "status-blank",
+        "status-invalid",
+        "status-missing",
+        "title-blank",
+        "title-missing",
+    ]
+    assert "title" not in variants["title-missing"]
+    assert variants["status-invalid"]["status"] not in ("pending", "completed")
@@ -0,0 +1,22 @@
+import time
+
+from support.client import Client
+from support.ratelimit import RequestScheduler
+from support.stub_server import StubServer
+
+
+def test_requests_are_paced_within_rate_limit():
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        time.sleep(seconds)
+
+    with StubServer(rate_limit=3, rate_limit_window=1) as server:
+        scheduler = RequestScheduler(max_retries=3, sleep=sleep)
+        client = Client(server.base_url, "token", scheduler=scheduler)
+        statuses = [client.get("/users").status_code for _ in range(5)]
+
+    assert statuses == [200] * 5
+    assert sleeps
+    assert scheduler.retries == 0
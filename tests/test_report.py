@@ -0,0 +1,100 @@
+import json
+
+from support import report
+from support.metrics import MetricsRecorder
+
+
+def test_render_paginates_and_survives_a_killed_run(tmp_path):
+    path = tmp_path / "results.jsonl"
+    message = "Instance:\n{}\n\nJSON schema validation errors:\n<id>"
+    records = [{"type": "session", "started": 0}]
+    for i in range(5):
+        records.append(
+            {
+                "type": "test",
+                "nodeid": f"test_x.py::test_{i}",
+                "outcome": "failed" if i == 3 else "passed",
+                "duration": 0.01,
+                "message": message if i == 3 else None,
+                "requests": [
+                    {
+                        "method": "GET",
+                        "url": "http://api/users",
+                        "status": 200,
+                        "elapsed_ms": 1.5,
+                        "request": None,
+                        "response": "[]",
+                    }
+                ],
+                "requests_dropped": 0,
+            }
+        )
+    # the job was killed while writing the last line, there is no summary
+    path.write_text(
+        "".join(json.dumps(r) + "\n" for r in records) + '{"type": "te'
+    )
+
+    out = tmp_path / "html"
+    assert report.render([str(path)], str(out), page_size=2) == 3
+    index = (out / "index.html").read_text()
+    assert "did not finish" in index
+    assert "page-0002.html#test_x.py::test_3" in index
+    page = (out / "page-0002.html").read_text()
+    assert "&lt;id&gt;" in page
+    assert "GET http://api/users -&gt; 200" in page
+    assert "page-0003.html" in page and "test_4" not in page
+
+
+def test_request_log_is_bounded(monkeypatch):
+    class Response:
+        url = "http://api/users"
+        status_code = 200
+        content = b"x" * (report.MAX_BODY + 10)
+
+        class elapsed:
+            @staticmethod
+            def total_seconds():
+                return 0.002
+
+    monkeypatch.setattr(report, "MAX_REQUESTS", 2)
+    log = report.RequestLog()
+    for _ in range(3):
+        log.record("GET", "/users", None, Response())
+    entries, dropped = log.drain()
+    assert (len(entries), dropped) == (2, 1)
+    assert entries[0]["response"].endswith("...")
+    assert len(entries[0]["response"]) == report.MAX_BODY + 3
+    assert log.drain() == ([], 0)
+
+
+def test_request_bodies_are_shown_as_json():
+    assert report._excerpt({"name": "Ann", "active": True, "due_on": None}) == (
+        '{"name": "Ann", "active": true, "due_on": null}'
+    )
+    long_body = {"body": "x" * report.MAX_BODY}
+    assert report._excerpt(long_body).endswith("...")
+    assert len(report._excerpt(long_body)) == report.MAX_BODY + 3
+
+
+def test_render_includes_the_latency_table(tmp_path):
+    results = tmp_path / "results.jsonl"
+    results.write_text(json.dumps({"type": "summary", "counts": {}}) + "\n")
+    recorder = MetricsRecorder()
+    recorder.record("GET", "/users/1", 200, 100, None, 0.01, 0.02)
+    recorder.write_json(tmp_path / "latency.json")
+
+    out = tmp_path / "html"
+    report.main(
+        [
+            str(results),
+            "--out",
+            str(out),
+            "--latency-json",
+            str(tmp_path / "latency.json"),
+            "--latency-json",
+            str(tmp_path / "missing.json"),
+        ]
+    )
+    index = (out / "index.html").read_text()
+    assert "<h2>API latency</h2>" in index
+    assert "GET /users/{id}" in index
@@ -0,0 +1,48 @@
+import threading
+import time
+
+import pytest
+
+from support.singleflight import SingleFlight
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+@pytest.mark.parametrize("fails", (False, True), ids=("result", "error"))
+def test_concurrent_callers_share_one_call(fails):
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait()
+        if fails:
+            raise ValueError("boom")
+        return object()
+
+    results = [None] * 4
+
+    def call(index):
+        try:
+            results[index] = flight.do("GET /users", func)
+        except ValueError as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: flight.shared == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert isinstance(results[0], ValueError) == fails
+    assert not flight.calls
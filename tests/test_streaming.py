@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from support import streaming
+from support.streaming import StreamDecodeError, iter_json_array
+
+RECORDS = [
+    {"id": 1, "name": "Zoë Ñúñez", "score": 12345},
+    {"id": 2, "name": "[x], {y}", "due_on": None},
+    -7.5e3,
+    [],
+    'quote " backslash \\ ] }',
+    {"nested": [{"a": [1, "]"]}, {}], "b": "\\"},
+    True,
+]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 3, 16384))
+def test_iter_json_array_matches_json_loads(chunk_size):
+    raw = json.dumps(RECORDS, ensure_ascii=False, indent=1).encode()
+    chunks = (raw[i : i + chunk_size] for i in range(0, len(raw), chunk_size))
+    assert list(iter_json_array(chunks)) == RECORDS
+
+
+def test_large_item_is_decoded_once(monkeypatch):
+    calls = []
+    decode = streaming._decoder.raw_decode
+
+    class Decoder:
+        def raw_decode(self, text, position):
+            calls.append(position)
+            return decode(text, position)
+
+    monkeypatch.setattr(streaming, "_decoder", Decoder())
+    item = {"id": 1, "body": "x" * 100000, "tags": ["a"] * 1000}
+    raw = json.dumps([item, item]).encode()
+    chunks = (raw[i : i + 100] for i in range(0, len(raw), 100))
+    assert list(iter_json_array(chunks)) == [item, item]
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize(
+    "raw",
+    (b'{"id": 1}', b"[1 2]", b'[{"id": 1},', b'[{"id": 1', b'[{"id": 1]', b"[] []"),
+)
+def test_iter_json_array_rejects_invalid_bodies(raw):
+    with pytest.raises(StreamDecodeError):
+        list(iter_json_array([raw]))
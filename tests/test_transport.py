@@ -0,0 +1,93 @@
+import socket
+import time
+
+import pytest
+import requests
+
+from support.client import AsyncClient, Client
+from support.hedging import Hedger
+from support.metrics import MetricsRecorder
+from support.stub_server import StubServer
+from support.transport import TransportConfig, pool_size
+
+
+class FakeConfig:
+    def __init__(self, hedger=None, **options):
+        self.hedger = hedger
+        self.options = {"concurrency": 8, "load": False, "load_concurrency": 4}
+        self.options.update(options)
+
+    def getoption(self, name):
+        return self.options[name]
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer(seed_size=5) as server:
+        yield server
+
+
+def only_pool(adapter):
+    pools = adapter.poolmanager.pools
+    assert len(pools) == 1
+    return pools[next(iter(pools.keys()))]
+
+
+def connects(recorder):
+    return sum(stats.connect.count for stats in recorder.endpoints.values())
+
+
+def test_pool_size_covers_the_largest_consumer():
+    assert pool_size(FakeConfig()) == 8
+    assert pool_size(FakeConfig(load=True, load_concurrency=32)) == 32
+    hedger = Hedger(budget=0.05, max_workers=16)
+    try:
+        assert pool_size(FakeConfig(hedger=hedger)) == 16
+    finally:
+        hedger.close()
+
+
+def test_adapter_pool_holds_pool_size_connections(stub_server):
+    client = Client(stub_server.base_url, "token")
+    adapter = TransportConfig(concurrency=4, pool_size=12).apply(client)
+    assert client.get("/users").status_code == 200
+    assert only_pool(adapter).pool.maxsize == 12
+
+
+def test_read_timeout_is_applied():
+    listener = socket.create_server(("127.0.0.1", 0))
+    try:
+        # accepted by the backlog but never answered
+        host, port = listener.getsockname()
+        client = Client(f"http://{host}:{port}", "token")
+        TransportConfig(connect_timeout=1.0, read_timeout=0.2).apply(client)
+        assert client.timeout == (1.0, 0.2)
+        started = time.perf_counter()
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.session.get(f"{client.base_url}/users", timeout=client.timeout)
+        assert time.perf_counter() - started < 2
+    finally:
+        listener.close()
+
+
+def test_warmed_connections_are_reused(stub_server):
+    recorder = MetricsRecorder()
+    client = Client(stub_server.base_url, "token", metrics=recorder)
+    transport = TransportConfig(concurrency=8)
+    adapter = transport.apply(client)
+    assert transport.warm_up(client, 8) == 8
+    pool = only_pool(adapter)
+    # concurrent warm-up requests may share a connection that came back early
+    warmed = pool.num_connections
+    assert 1 <= warmed <= 8 and pool.pool.qsize() == 8
+
+    async_client = AsyncClient(client, concurrency=warmed)
+    try:
+        responses = async_client.gather(
+            *(async_client.get("/users", {"page": 1}) for _ in range(warmed))
+        )
+    finally:
+        async_client.close()
+    assert [response.status_code for response in responses] == [200] * warmed
+    assert connects(recorder) == 0
+    assert pool.num_connections == warmed
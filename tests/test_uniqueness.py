@@ -0,0 +1,45 @@
+import pytest
+
+from support.uniqueness import BLOCK_IDS, DENSE_IDS, REGION_BLOCKS, DuplicateDetector
+
+
+@pytest.mark.parametrize("dense_ids", (1, DENSE_IDS), ids=("bitmaps", "sparse"))
+@pytest.mark.parametrize("memory_limit", (0, None), ids=("spilled", "in-memory"))
+def test_duplicate_detector_reports_pages(memory_limit, dense_ids):
+    kwargs = {} if memory_limit is None else {"memory_limit": memory_limit}
+    with DuplicateDetector(dense_ids=dense_ids, **kwargs) as detector:
+        assert detector.add_page(1, [3, 2, 1, BLOCK_IDS * 1000, -4]) == 0
+        assert detector.add_page(2, [5, 4, 3, BLOCK_IDS * 1000]) == 2
+        assert detector.add_page(3, [3, "a", "a"]) == 2
+        assert detector.duplicates == {
+            3: [1, 2, 3],
+            BLOCK_IDS * 1000: [1, 2],
+            "a": [3, 3],
+        }
+        assert detector.count == 12
+        assert bool(detector.spill_maps) == (memory_limit == 0 and dense_ids == 1)
+
+
+def test_block_becomes_a_bitmap_once_dense():
+    with DuplicateDetector(dense_ids=4) as detector:
+        detector.add_page(1, [1, 2, 3])
+        assert not detector.blocks
+        detector.add_page(2, [4, 3])
+        assert list(detector.blocks) == [0]
+        assert not detector.sparse
+        assert detector.duplicates == {3: [1, 2]}
+
+
+def test_far_apart_ids_spill_into_few_mappings():
+    ids = [i * BLOCK_IDS * 61 for i in range(REGION_BLOCKS * 3)]
+    with DuplicateDetector(memory_limit=0) as detector:
+        assert detector.add_page(1, ids) == 0
+        # sparse ids don't get a block each
+        assert not detector.blocks and not detector.spill_maps
+
+    with DuplicateDetector(memory_limit=0, dense_ids=1) as detector:
+        assert detector.add_page(1, ids) == 0
+        assert detector.add_page(2, ids[::100]) == len(ids[::100])
+        assert len(detector.blocks) == len(ids)
+        assert len(detector.spill_maps) == 3
+        assert detector.duplicates[ids[100]] == [1, 2]
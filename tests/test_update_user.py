@@ -1,9 +1,9 @@
 import pytest
 
-GENDERS = ["make", "female"]
-STATUSES = ["active", "inactive"]
+from support import scenarios
 
 
+@pytest.mark.mutates("user")
 @pytest.mark.parametrize(
     ("data",),
     (
@@ -58,43 +58,20 @@ STATUSES = ["active", "inactive"]
 )
 def test_update_user_ok(
     data,
-    create_user,
+    existing_user,
     rest_client,
-    fake,
-    response_is_json,
+    payloads,
     get_schema,
     validate_jsonschema,
 ):
-    user_id = create_user()
-    data = data.copy()
-    if data.get("name") == "<random>":
-        data["name"] = fake.name()
-    if data.get("email") == "<random>":
-        data["email"] = fake.email()
-    if data.get("gender") == "<random>":
-        data["gender"] = fake.random_element(GENDERS)
-    if data.get("status") == "<random>":
-        data["status"] = fake.random_element(STATUSES)
+    user_id = existing_user
+    data = payloads("user").fill(data)
 
-    path = f"/users/{user_id}"
-    response = rest_client.put(path, data=data)
-    assert response.status_code == 200
-    assert response_is_json(response)
-    result = response.json()
+    result = scenarios.update_user(rest_client, user_id, data)
 
     schema = get_schema("user")
     validate_jsonschema(result, schema)
 
-    assert result["id"] == user_id
-    if "name" in data:
-        assert result["name"] == data["name"]
-    if "email" in data:
-        assert result["email"] == data["email"]
-    if "gender" in data:
-        assert result["gender"] == data["gender"]
-    if "status" in data:
-        assert result["status"] == data["status"]
-
 
 @pytest.mark.parametrize(
     ("data", "expected_messages"),
@@ -180,38 +157,22 @@ def test_update_user_ok(
     ),
 )
 def test_update_user_invalid_data(
-    rest_client, create_user, data, fake, expected_messages, response_is_json
+    rest_client, existing_user, data, payloads, expected_messages
 ):
-    data = data.copy()
-    if data.get("name") == "<random>":
-        data["name"] = fake.name()
-    if data.get("email") == "<random>":
-        data["email"] = fake.email()
+    data = payloads("user").fill(data)
 
-    user_id = create_user()
+    user_id = existing_user
     response = rest_client.put(f"/users/{user_id}", data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    result = scenarios.validation_errors(response)
 
     sorted_result = sorted(result, key=lambda x: x["field"])
     sorted_expected = sorted(expected_messages, key=lambda x: x["field"])
     assert sorted_result == sorted_expected
 
 
-def test_update_non_existing_user(rest_client, fake, response_is_json):
+def test_update_non_existing_user(rest_client, payloads, response_is_json):
     user_id = -1
-    name = fake.name()
-    email = fake.email()
-    gender = fake.random_element(GENDERS)
-    status = fake.random_element(STATUSES)
-    data = {
-        "name": name,
-        "email": email,
-        "gender": gender,
-        "status": status,
-    }
+    data = payloads("user").next()
 
     path = f"/users/{user_id}"
     response = rest_client.put(path, data=data)
@@ -221,17 +182,16 @@ def test_update_non_existing_user(rest_client, fake, response_is_json):
     assert result == {"message": "Resource not found"}
 
 
-def test_update_user_with_taken_email(rest_client, create_user, fake, response_is_json):
-    email = fake.email()
+def test_update_user_with_taken_email(
+    rest_client, create_user, existing_user, payloads
+):
+    email = payloads("user").next()["email"]
     create_user(email=email)
-    user_id = create_user()
+    user_id = existing_user
     data = {
         "email": email,
     }
     path = f"/users/{user_id}"
     response = rest_client.put(path, data=data)
-    assert response.status_code == 422
-    assert response_is_json(response)
-    result = response.json()
-    assert isinstance(result, list)
+    result = scenarios.validation_errors(response)
     assert result == [{"field": "email", "message": "has already been taken"}]
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from support.cleanup import ResourceTracker
+from support.client import Client
+from support.stub_server import StubServer
+from support.user_pool import UserPool
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make_pool_(size, **kwargs):
+        count = iter(range(10**6))
+
+        def make_data():
+            n = next(count)
+            return {
+                "name": f"Pool User {n}",
+                "email": f"pool.user.{n}@example.com",
+                "gender": "female",
+                "status": "active",
+            }
+
+        client = Client(server.base_url, "token", tracker=ResourceTracker())
+        pool = UserPool(client, make_data, size, concurrency=4, **kwargs)
+        pools.append(pool)
+        return pool
+
+    with StubServer() as server:
+        yield make_pool_
+        for pool in pools:
+            pool.close()
+
+
+def posts(pool):
+    """POST /users sent once the pool's background creations are done."""
+    deadline = time.monotonic() + 5
+    while pool.creating:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return pool.client.tracker.created
+
+
+def test_start_fills_the_pool(make_pool):
+    pool = make_pool(8).start()
+    assert posts(pool) == 8
+    assert pool.ready.qsize() == 8
+
+
+def test_acquiring_the_pool_size_creates_only_low_water_more(make_pool):
+    pool = make_pool(8, low_water=2)
+    ids = [pool.acquire() for _ in range(8)]
+    assert len(set(ids)) == 8
+    assert posts(pool) == 10
+
+
+def test_acquiring_past_an_empty_pool(make_pool):
+    pool = make_pool(2, low_water=1)
+    ids = [pool.acquire() for _ in range(5)]
+    assert len(set(ids)) == 5
+    # one creation in flight ahead of each acquire once the pool is empty
+    assert posts(pool) == 6
+
+
+def test_acquire_creates_a_user_when_none_is_on_the_way(make_pool):
+    pool = make_pool(1, low_water=0)
+    ids = [pool.acquire() for _ in range(3)]
+    assert len(set(ids)) == 3
+    assert posts(pool) == 3
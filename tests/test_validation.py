@@ -0,0 +1,57 @@
+import pytest
+
+from support.validation import ValidatorRegistry, build_fast_path
+
+
+@pytest.mark.parametrize("name", ("user", "post", "todo"))
+@pytest.mark.parametrize(
+    "instance",
+    (
+        pytest.param(
+            {
+                "id": 1,
+                "user_id": 1,
+                "name": "Foo",
+                "title": "Foo",
+                "body": "Bar",
+                "email": "foo@example.com",
+                "gender": "male",
+                "status": "active",
+                "due_on": None,
+            },
+            id="all-fields",
+        ),
+        pytest.param({}, id="empty"),
+        pytest.param([], id="not-object"),
+        pytest.param({"id": True}, id="bool-id"),
+        pytest.param({"id": 0, "user_id": 1, "title": "", "body": "x"}, id="bounds"),
+        pytest.param(
+            {"id": 1, "user_id": 1, "title": "x", "due_on": None, "status": "done"},
+            id="invalid-enum",
+        ),
+    ),
+)
+def test_fast_path_agrees_with_jsonschema(name, instance, get_schema):
+    schema = get_schema(name)
+    fast_is_valid = build_fast_path(schema)
+    assert fast_is_valid is not None
+
+    validator = ValidatorRegistry(fast_path=False).get(schema).validator
+    assert fast_is_valid(instance) == validator.is_valid(instance)
+
+
+def test_registry_compiles_equal_schemas_once(get_schema):
+    registry = ValidatorRegistry()
+
+    def wrapper():
+        return {
+            "definitions": {"todo": get_schema("todo")},
+            "type": "array",
+            "items": {"$ref": "#/definitions/todo"},
+            "uniqueItems": True,
+        }
+
+    compiled = registry.get(wrapper())
+    assert registry.get(wrapper()) is compiled
+    assert compiled.fast_is_valid is not None
+    assert "$ref" not in compiled.schema["items"]